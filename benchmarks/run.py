@@ -0,0 +1,190 @@
+"""Benchmarks of the core operations of the engine
+
+Usage::
+
+    python benchmarks/run.py                          # runs every benchmark and prints the results
+    python benchmarks/run.py -o results.json          # also writes them as JSON
+    python benchmarks/run.py -k 19x19 -k play --quick # runs the benchmarks whose name contains all the filters, fewer repeats
+    python benchmarks/run.py --compare before.json after.json
+
+Each benchmark is timed `repeat` times and the best and median times per call are kept,
+the best time being the most stable number to compare between commits.
+Games are generated with a seeded random player so the positions are the same from one run to the next.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+from typing import (
+    Callable,
+    Optional,
+)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import gogame  # noqa: E402
+from gogame import Board, Color, Player  # noqa: E402
+
+BOARDS = {
+    '9x9': (lambda: Board(size=9), 2),
+    '13x13': (lambda: Board(size=13), 2),
+    '19x19': (lambda: Board(size=19), 2),
+    'circular19': (lambda: Board.circular(19), 2),
+    '19x19-3p': (lambda: Board(size=19), 3),
+}
+COLORS = [Color.Black, Color.White, Color.Green, Color.Blue]
+OPERATIONS = ['play', 'playable_moves', 'is_playable', 'run_game', 'clone', 'from_grid', 'construct']
+
+
+class RandomPlayer(Player):
+    """The random player of the examples, with its own seeded generator"""
+    def __init__(self, name: Optional[str] = None, color: Optional[Color] = None, seed: int = 0):
+        super().__init__(name, color)
+        self.rng = random.Random(seed)
+
+    def play(self):
+        moves = self.playable_moves()
+        return self.rng.choice(moves) if moves else None
+
+
+def _new_game(name: str, seed: int = 0) -> Board:
+    factory, players = BOARDS[name]
+    board = factory()
+    for i in range(players):
+        board.join(RandomPlayer(color=COLORS[i], seed=seed + i))
+    return board
+
+
+def _record(name: str) -> list[tuple[Color, Optional[tuple[int, int]]]]:
+    """Plays a seeded random game and returns its moves, to be played again by the benchmarks"""
+    board = _new_game(name)
+    height, width = board.shape
+    board.run_game(max_turn=height * width)
+    return [(move.color, move.vertice) for move in board._moves]
+
+
+def _play(name: str, moves: list[tuple[Color, Optional[tuple[int, int]]]]) -> Board:
+    board = BOARDS[name][0]()
+    for color, move in moves:
+        if move is None:
+            board.skip(color=color)
+        else:
+            board.play(*move, color=color)
+    return board
+
+
+def _time(function: Callable[[], object], number: int, repeat: int) -> tuple[float, float]:
+    """Returns the best and median seconds per call"""
+    times = sorted(t / number for t in timeit.Timer(function).repeat(repeat, number))
+    return times[0], times[len(times) // 2]
+
+
+def _cases(name: str) -> list[tuple[str, str, int, Callable[[], object]]]:
+    """Returns the benchmarks of a board as (operation, unit, operations per call, function)"""
+    moves = _record(name)
+    middle = _play(name, moves[:len(moves) // 2])
+    middle.clear_players()
+    color = moves[len(moves) // 2][0]
+    vertices = [(x, y) for x, y in np.argwhere(middle.matrix() == Color.Empty.value).tolist()]
+    grid = middle.matrix()
+    factory = BOARDS[name][0]
+
+    def run_game():
+        board = _new_game(name, seed=1)
+        board.run_game(max_turn=board.shape[0] * board.shape[1])
+
+    def is_playable():
+        for x, y in vertices:
+            middle.is_playable(x, y, color)
+
+    return [
+        ('play', 'moves/s', len(moves), lambda: _play(name, moves)),
+        ('playable_moves', 's', 1, lambda: middle.playable_moves(color)),
+        ('is_playable', 's', len(vertices), is_playable),
+        ('run_game', 'games/s', 1, run_game),
+        ('clone', 's', 1, middle.clone),
+        ('from_grid', 's', 1, lambda: Board.from_grid(grid)),
+        ('construct', 's', 1, factory),
+    ]
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'gogame': gogame.__version__,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def run(filters: list[str], quick: bool = False) -> dict:
+    """Runs the benchmarks whose `board/operation` name contains all the filters
+
+    Returns:
+        The results with the metadata of the run, as written in the JSON output"""
+    repeat = 3 if quick else 7
+    results = []
+    for name in BOARDS:
+        if not any(all(f in f'{name}/{operation}' for f in filters) for operation in OPERATIONS):
+            continue
+        for operation, unit, count, function in _cases(name):
+            key = f'{name}/{operation}'
+            if not all(f in key for f in filters):
+                continue
+            function()
+            once = timeit.Timer(function).timeit(1)
+            number = max(1, int((0.02 if quick else 0.1) / max(once, 1e-9)))
+            best, median = _time(function, number, repeat)
+            value = count / best if unit.endswith('/s') else best / count
+            results.append({'name': key, 'board': name, 'operation': operation, 'unit': unit, 'value': value,
+                            'best': best, 'median': median, 'count': count, 'number': number, 'repeat': repeat})
+            print(f"{key:<28} {value:>14.6g} {unit}", flush=True)
+    return {'metadata': _metadata(), 'results': results}
+
+
+def compare(before: dict, after: dict) -> None:
+    """Prints the ratio of each result of `after` to the one of `before`, above 1 when `after` is faster"""
+    old = {r['name']: r for r in before['results']}
+    for result in after['results']:
+        previous = old.get(result['name'])
+        if previous is None:
+            continue
+        ratio = previous['best'] / result['best']
+        print(f"{result['name']:<28} {previous['value']:>12.6g} -> {result['value']:>12.6g} {result['unit']:<8} x{ratio:.2f}")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-o', '--output', help="a JSON file where to write the results")
+    parser.add_argument('-k', '--filter', action='append', default=[],
+                        help="only runs the benchmarks whose name contains the value, can be repeated")
+    parser.add_argument('--quick', action='store_true', help="fewer and shorter repeats")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="compares two JSON result files")
+    args = parser.parse_args(argv)
+    if args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            compare(json.load(before), json.load(after))
+        return
+    results = run(args.filter, args.quick)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
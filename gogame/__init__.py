@@ -6,6 +6,8 @@ __version__ = '1.0.0'
 
 
 from .board import *
+from .batch import *
+from .bitboard import *
 from .territory import *
 from .player import *
 from .enum import *
@@ -0,0 +1,299 @@
+from __future__ import annotations
+import json
+import os
+from typing import (
+    Iterable,
+    Optional,
+    Union,
+)
+
+import numpy as np
+
+from .board import Board, _neighbour_table, _shape_of, _zobrist_keys, _zobrist_table, color_list
+from .enum import Color
+from .playout import _replay
+
+_version = 1
+_skip = np.iinfo(np.uint16).max
+_files = {
+    'offsets': np.uint64,
+    'moves': np.uint16,
+    'colors': np.int8,
+    'starts': np.int8,
+    'planes': np.int8,
+}
+
+
+def _map(path: str, dtype) -> np.ndarray:
+    """Maps a file of the archive read-only, numpy cannot map an empty file"""
+    if not os.path.getsize(path):
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r')
+
+
+class ArchiveWriter:
+    """Appends games to a binary archive which can be read with :class:`GameArchive`
+
+    An archive is a directory of raw arrays: the moves of all games as flat vertices `x * width + y` in `uint16`
+    (65535 for a skip) with the color of each move in `int8`, the position before the first move of each game
+    as an `int8` plane of :class:`Color` values, and the offset of the first move of each game.
+    Optionally, the position after every move is stored as well, so that any position is read without replaying.
+
+    Games are written as they are added, an existing archive is extended. The writer can be used as a context manager:
+
+        >>> with ArchiveWriter('games', size=9) as writer:
+        ...     writer.add(board)
+    """
+    def __init__(self, path: Union[str, os.PathLike], size: Union[int, tuple[int, int]] = 19, *, planes: bool = False):
+        """
+        Args:
+            path: The directory of the archive, created if it does not exist
+            size: The size of the boards, either an int for square boards, or a tuple (height, width)
+            planes: Whether to store the position after every move, `height * width` bytes per move
+
+        Raises:
+            ValueError: The boards have more vertices than a `uint16` can index,
+                or the archive exists with another size or planes setting"""
+        self.path: str = os.fspath(path)
+        self.shape: tuple[int, int] = _shape_of(size)
+        self.planes: bool = planes
+        if self.shape[0] * self.shape[1] >= _skip:
+            raise ValueError(f"Archived boards have less than {_skip} vertices")
+        header = os.path.join(self.path, 'header.json')
+        if os.path.exists(header):
+            with open(header) as file:
+                meta = json.load(file)
+            if tuple(meta['shape']) != self.shape or meta['planes'] != planes:
+                raise ValueError(f"The archive {self.path} holds {tuple(meta['shape'])} boards with planes={meta['planes']}")
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            for name in _files:
+                open(os.path.join(self.path, f'{name}.bin'), 'wb').close()
+            with open(header, 'w') as file:
+                json.dump({'version': _version, 'shape': list(self.shape), 'planes': planes}, file)
+        self._files = {name: open(os.path.join(self.path, f'{name}.bin'), 'ab') for name in _files}
+        offsets = os.path.getsize(os.path.join(self.path, 'offsets.bin')) // 8
+        self._count: int = max(offsets - 1, 0)
+        self._total: int = os.path.getsize(os.path.join(self.path, 'moves.bin')) // 2
+        if not offsets:
+            self._files['offsets'].write(np.zeros(1, dtype=np.uint64).tobytes())
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def close(self) -> None:
+        """Flushes and closes the files of the archive"""
+        for file in self._files.values():
+            file.close()
+
+    def add(self, board: Board) -> int:
+        """Adds the moves played on a board, for example at the end of :func:`Board.run_game`
+
+        Args:
+            board: The board to archive, its moves are the ones which can be undone with :func:`Board.undo`
+
+        Raises:
+            ValueError: The board has another size than the archive
+
+        Returns:
+            The index of the game in the archive"""
+        moves = [(m.color, m.vertice) for m in board._moves]
+        return self.add_moves(moves, board._initial_grid())
+
+    def add_moves(self,
+                  moves: Iterable[tuple[Color, Optional[tuple[int, int]]]],
+                  start: Optional[np.ndarray] = None
+                  ) -> int:
+        """Adds a game given as its moves, for example the moves of an :class:`gogame.sgf.SGFGame`
+
+        Args:
+            moves: The moves as (color, vertice) pairs, the vertice is None for a skip
+            start: The grid of :class:`Color` values before the first move, an empty board by default
+
+        Raises:
+            IndexError: A vertice is out of the board
+            ValueError: The start grid has another size than the archive or contains values which are not colors,
+                or a vertice is not empty when it is played (only checked when planes are stored)
+
+        Returns:
+            The index of the game in the archive"""
+        height, width = self.shape
+        if start is None:
+            start = np.zeros(self.shape, dtype=np.int8)
+        start = np.asarray(start)
+        if start.shape != self.shape:
+            raise ValueError(f"The archive holds {self.shape} boards, not {start.shape}")
+        if not np.isin(start, color_list).all():
+            raise ValueError("The grid contains values which are not colors")
+        start = start.astype(np.int8)
+        flat = []
+        for color, move in moves:
+            if move is None:
+                flat.append((color.value, -1))
+            else:
+                x, y = move
+                if not (0 <= x < height and 0 <= y < width):
+                    raise IndexError(f"{move} is out of the board")
+                flat.append((color.value, x * width + y))
+        colors = np.array([c for c, _ in flat], dtype=np.int8)
+        vertices = np.array([v for _, v in flat], dtype=np.int64)
+        if self.planes:
+            planes = np.empty((len(flat), height * width), dtype=np.int8)
+            _zobrist_table(self.shape)
+            neighbours = _neighbour_table(start == Color.Wall.value).lists
+            _replay(start, neighbours, _zobrist_keys[self.shape], 0, flat, planes)
+            self._files['planes'].write(planes.tobytes())
+        self._files['moves'].write(np.where(vertices < 0, _skip, vertices).astype(np.uint16).tobytes())
+        self._files['colors'].write(colors.tobytes())
+        self._files['starts'].write(start.tobytes())
+        self._total += len(flat)
+        self._files['offsets'].write(np.array([self._total], dtype=np.uint64).tobytes())
+        self._count += 1
+        return self._count - 1
+
+
+class GameArchive:
+    """Reads an archive written by :class:`ArchiveWriter`
+
+    The files are memory-mapped, so opening an archive is immediate whatever its size
+    and only the games which are accessed are read from the disk.
+    The moves of any game are reached in constant time through the offset index.
+    """
+    def __init__(self, path: Union[str, os.PathLike]):
+        """
+        Args:
+            path: The directory of the archive
+
+        Raises:
+            ValueError: The directory is not an archive of a supported version"""
+        self.path: str = os.fspath(path)
+        header = os.path.join(self.path, 'header.json')
+        if not os.path.exists(header):
+            raise ValueError(f"{self.path} is not a game archive")
+        with open(header) as file:
+            meta = json.load(file)
+        if meta.get('version') != _version:
+            raise ValueError(f"Unsupported archive version {meta.get('version')}")
+        self.shape: tuple[int, int] = tuple(meta['shape'])
+        self.planes: bool = meta['planes']
+        maps = {name: _map(os.path.join(self.path, f'{name}.bin'), dtype) for name, dtype in _files.items()}
+        self._offsets: np.ndarray = maps['offsets']
+        self._moves: np.ndarray = maps['moves']
+        self._colors: np.ndarray = maps['colors']
+        self._starts: np.ndarray = maps['starts'].reshape(-1, *self.shape)
+        self._planes: np.ndarray = maps['planes'].reshape(-1, *self.shape)
+        self._count: int = min(max(len(self._offsets) - 1, 0), len(self._starts))
+        if self._count and int(self._offsets[self._count]) > len(self._moves):
+            raise ValueError(f"The archive {self.path} is truncated")
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} games={len(self)} moves={self.total_moves} height={self.shape[0]} width={self.shape[1]}>"
+
+    @property
+    def total_moves(self) -> int:
+        """The number of moves of all games"""
+        return int(self._offsets[self._count]) if self._count else 0
+
+    def _bounds(self, game: int) -> tuple[int, int]:
+        if not -self._count <= game < self._count:
+            raise IndexError(f"The archive has {self._count} games")
+        game %= self._count
+        return int(self._offsets[game]), int(self._offsets[game + 1])
+
+    def length(self, game: int) -> int:
+        """Returns the number of moves of a game, skips included
+
+        Args:
+            game: The index of the game
+
+        Raises:
+            IndexError: The game does not exist"""
+        begin, end = self._bounds(game)
+        return end - begin
+
+    def moves(self, game: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the moves of a game without copying them
+
+        Args:
+            game: The index of the game
+
+        Raises:
+            IndexError: The game does not exist
+
+        Returns:
+            The flat vertices `x * width + y` as `uint16`, 65535 for a skip, and the color value of each move"""
+        begin, end = self._bounds(game)
+        return self._moves[begin:end], self._colors[begin:end]
+
+    def record(self, game: int) -> list[tuple[Color, Optional[tuple[int, int]]]]:
+        """Returns the moves of a game as (color, vertice) pairs, as accepted by :func:`Board.replay`
+
+        Args:
+            game: The index of the game
+
+        Raises:
+            IndexError: The game does not exist"""
+        begin, end = self._bounds(game)
+        return self._record(begin, end)
+
+    def _record(self, begin: int, end: int) -> list[tuple[Color, Optional[tuple[int, int]]]]:
+        width = self.shape[1]
+        vertices, colors = self._moves[begin:end].tolist(), self._colors[begin:end].tolist()
+        return [(Color(c), None if v == _skip else divmod(v, width)) for v, c in zip(vertices, colors)]
+
+    def _move_index(self, game: int, move: Optional[int]) -> tuple[int, int]:
+        begin, end = self._bounds(game)
+        if move is None:
+            return begin, end - begin
+        if not 0 <= move <= end - begin:
+            raise IndexError(f"The game has {end - begin} moves")
+        return begin, move
+
+    def position(self, game: int, move: Optional[int] = None) -> np.ndarray:
+        """Returns a position of a game as a grid of :class:`Color` values
+
+        The position is read directly when the archive stores planes, otherwise the moves are replayed from the start.
+
+        Args:
+            game: The index of the game
+            move: The number of moves played, 0 for the position before the first move, the end of the game by default
+
+        Raises:
+            IndexError: The game or the move does not exist
+
+        Returns:
+            An `int8` array of shape `(height, width)`, read-only when it is read from the archive"""
+        begin, move = self._move_index(game, move)
+        game %= self._count
+        if not move:
+            return self._starts[game]
+        if self.planes:
+            return self._planes[begin + move - 1]
+        return self.board(game, move)._grid
+
+    def board(self, game: int, move: Optional[int] = None) -> Board:
+        """Rebuilds a board at a position of a game with :func:`Board.from_grid` and :func:`Board.replay`,
+        with the prisoners and the position history of the game
+
+        Args:
+            game: The index of the game
+            move: The number of moves played, 0 for the position before the first move, the end of the game by default
+
+        Raises:
+            IndexError: The game or the move does not exist
+
+        Returns:
+            The new created board"""
+        begin, move = self._move_index(game, move)
+        board = Board.from_grid(self._starts[game % self._count])
+        board.replay(self._record(begin, begin + move))
+        return board
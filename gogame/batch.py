@@ -0,0 +1,186 @@
+from __future__ import annotations
+import numpy as np
+from typing import (
+    Union,
+)
+
+from .board import Board, _label, _nearby, _neighbours, _zobrist_table
+from .enum import Color
+
+
+def _liberties(grids: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    """Counts the distinct liberties of each group and spreads the count over the vertices of the group"""
+    empty = grids == Color.Empty.value
+    liberties = np.zeros(grids.size + 1, dtype=np.int32)
+    seen = []
+    for neighbour in _neighbours(labels, -1):
+        new = empty & (neighbour >= 0)
+        for s in seen:
+            new &= neighbour != s
+        liberties[:-1] += np.bincount(neighbour[new], minlength=grids.size).astype(np.int32)
+        seen.append(neighbour)
+    return liberties[labels]
+
+
+class BoardBatch:
+    """Represents several independent games of the same shape played in lockstep
+
+    All games are stored in a single `(count, height, width)` array and every operation is vectorized over the games.
+    The rules are the ones of :class:`Board`: captures, forbidden suicide and positional superko.
+
+    Note:
+        Moves are given as an array of `(x, y)` rows, one per game, a row with a negative `x` is a skip.
+        Games which are over ignore the moves given to them.
+    """
+    def __init__(self, count: int, *, size: Union[int, tuple[int, int]] = 19):
+        """
+        Args:
+            count: The number of games
+            size: The size of the boards, either an int for square boards, or a tuple (height, width)"""
+        self._init_from(Board(size=size), count)
+
+    @classmethod
+    def from_board(cls, board: Board, count: int) -> BoardBatch:
+        """Initialize a batch where every game starts from the position of a board
+
+        Args:
+            board: The board to copy, for example a board built with :func:`Board.circular`
+            count: The number of games
+
+        Returns:
+            The new created batch"""
+        batch = cls.__new__(cls)
+        batch._init_from(board, count)
+        return batch
+
+    def _init_from(self, board: Board, count: int) -> None:
+        self._grids: np.ndarray = np.repeat(board._grid[np.newaxis], count, axis=0)
+        self._zobrist: np.ndarray = _zobrist_table(board._grid.shape)
+        self._hashes: np.ndarray = np.full(count, board.hash, dtype=np.uint64)
+        self._salt: np.ndarray = np.random.default_rng(count).integers(
+            0, np.iinfo(np.uint64).max, size=count, dtype=np.uint64, endpoint=True)
+        history = np.fromiter(board._history, dtype=np.uint64, count=len(board._history))
+        self._history: np.ndarray = np.sort((history[:, np.newaxis] ^ self._salt).ravel())
+        self._passed: np.ndarray = np.full(count, board._passed)
+        self._over: np.ndarray = np.zeros(count, dtype=bool)
+        self._captured: np.ndarray = np.full(count, len(board._history) > 1)
+        self._prisoners: dict[Color, np.ndarray] = {c: np.full(count, n) for c, n in board._prisoners.items()}
+
+    def __len__(self):
+        return self._grids.shape[0]
+
+    def __getitem__(self, index: int) -> Board:
+        board = Board.from_grid(self._grids[index])
+        board._prisoners = {c: int(n[index]) for c, n in self._prisoners.items()}
+        return board
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} count={len(self)} width={self._grids.shape[1]} height={self._grids.shape[2]}>"
+
+    @property
+    def over(self) -> np.ndarray:
+        """A boolean array indicating which games are over"""
+        return self._over.copy()
+
+    def matrix(self) -> np.ndarray:
+        """Returns the state of all boards as a `(count, height, width)` matrix of :class:`Color` values"""
+        return self._grids.copy()
+
+    def legal_mask(self, color: Color) -> np.ndarray:
+        """Computes the validity of every move of a color in every game
+
+        Args:
+            color: The color of the player to check
+
+        Returns:
+            A boolean array of shape `(count, height, width)`, True where the player can play"""
+        if not color.is_player():
+            raise ValueError(f"{color.name} is not a player color")
+        labels = _label(self._grids, self._grids > 0)
+        return self._legal_mask(color, labels, _liberties(self._grids, labels))
+
+    def _legal_mask(self, color: Color, labels: np.ndarray, liberties: np.ndarray) -> np.ndarray:
+        grids = self._grids
+        empty = grids == Color.Empty.value
+        friend = (grids == color.value) & (liberties > 1)
+        capture = (grids > 0) & (grids != color.value) & (liberties <= 1)
+        mask = empty & (_nearby(empty) | _nearby(friend) | _nearby(capture)) & ~self._over[:, np.newaxis, np.newaxis]
+
+        stones = labels >= 0
+        group_hashes = np.zeros(grids.size, dtype=np.uint64)
+        x, y = np.nonzero(stones)[1:]
+        np.bitwise_xor.at(group_hashes, labels[stones], self._zobrist[grids[stones], x, y])
+        positions = (self._hashes ^ self._salt)[:, np.newaxis, np.newaxis] ^ self._zobrist[color.value]
+        seen = []
+        for neighbour in _neighbours(np.where(capture, labels, -1), -1):
+            new = (neighbour >= 0)
+            for s in seen:
+                new &= neighbour != s
+            positions ^= np.where(new, group_hashes[neighbour], np.uint64(0))
+            seen.append(neighbour)
+        check = mask & self._captured[:, np.newaxis, np.newaxis]
+        index = np.searchsorted(self._history, positions[check]).clip(max=self._history.size - 1)
+        mask[check] = self._history[index] != positions[check]
+        return mask
+
+    def play(self, moves: np.ndarray, *, color: Color) -> np.ndarray:
+        """Plays one move in every game
+
+        Args:
+            moves: An array of shape `(count, 2)` with the `(x, y)` move of each game, negative values to skip
+            color: The color of the moves to play
+
+        Raises:
+            ValueError: A move is invalid
+
+        Returns:
+            A boolean array indicating which games are over, a game ends on the second skip in a row"""
+        if not color.is_player():
+            raise ValueError(f"{color.name} is not a player color")
+        moves = np.asarray(moves).reshape(len(self), 2)
+        skip = (moves[:, 0] < 0) | self._over
+        games = np.nonzero(~skip)[0]
+        x, y = moves[games, 0], moves[games, 1]
+        labels = _label(self._grids, self._grids > 0)
+        liberties = _liberties(self._grids, labels)
+        if not self._legal_mask(color, labels, liberties)[games, x, y].all():
+            raise ValueError('You cannot play here')
+
+        atari = (self._grids > 0) & (self._grids != color.value) & (liberties <= 1)
+        captured = [neighbour[games, x, y] for neighbour in _neighbours(np.where(atari, labels, -1), -1)]
+        captured = np.concatenate(captured)
+        dead = np.isin(labels, captured[captured >= 0])
+
+        self._over |= skip & self._passed & self._grids.any(axis=(1, 2))
+        self._passed = skip
+        self._grids[games, x, y] = color.value
+        self._hashes[games] ^= self._zobrist[color.value, x, y]
+        games, x, y = np.nonzero(dead)
+        np.bitwise_xor.at(self._hashes, games, self._zobrist[self._grids[games, x, y], x, y])
+        if color not in self._prisoners:
+            self._prisoners[color] = np.zeros(len(self), dtype=int)
+        self._prisoners[color] += np.bincount(games, minlength=len(self))
+        self._captured[games] = True
+        self._grids[dead] = Color.Empty.value
+        self._history = np.sort(np.concatenate([self._history, self._hashes ^ self._salt]), kind='stable')
+        return self._over.copy()
+
+    def prisoners(self, color: Color) -> np.ndarray:
+        """Get the number of prisoners owned by a player in each game
+
+        Args:
+            color: The color of the player
+
+        Returns:
+            The number of prisoners of each game"""
+        return self._prisoners.get(color, np.zeros(len(self), dtype=int)).copy()
+
+    def score(self, color: Color) -> np.ndarray:
+        """Returns the score of a player in each game, computed as in :func:`Board.score`
+
+        Args:
+            color: The color of the player
+
+        Returns:
+             The score of the given player in each game"""
+        return self.prisoners(color) + np.count_nonzero(self._grids == color.value, axis=(1, 2))
@@ -0,0 +1,422 @@
+from __future__ import annotations
+import copy
+import numpy as np
+from typing import (
+    Generator,
+    Optional,
+    Union,
+    TYPE_CHECKING
+)
+
+from .board import (
+    Board,
+    NeighbourTable,
+    color_list,
+    max_color,
+    _color_of,
+    _ellipse_mask,
+    _neighbour_table,
+    _shape_of,
+    _zobrist_table
+)
+from .enum import Color
+
+if TYPE_CHECKING:
+    from .player import Player
+
+_bit_keys: dict[tuple[int, int], list[list[int]]] = {}
+
+
+def _keys_of(shape: tuple[int, int]) -> list[list[int]]:
+    """Returns the Zobrist keys of :class:`Board` indexed by bit, the padding column has null keys"""
+    if shape not in _bit_keys:
+        table = np.pad(_zobrist_table(shape), [(0, 0), (0, 0), (0, 1)])
+        _bit_keys[shape] = table.reshape(max_color + 1, -1).tolist()
+    return _bit_keys[shape]
+
+
+def _pack(mask: np.ndarray) -> int:
+    """Packs a boolean array into a bitboard, each row is followed by an unused bit so that shifts never wrap"""
+    padded = np.pad(mask.astype(bool), [(0, 0), (0, 1)])
+    return int.from_bytes(np.packbits(padded.ravel(), bitorder='little').tobytes(), 'little')
+
+
+def _unpack(bits: int, shape: tuple[int, int]) -> np.ndarray:
+    height, width = shape
+    count = height * (width + 1)
+    data = np.frombuffer(bits.to_bytes((count + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, count=count, bitorder='little').reshape(height, width + 1)[:, :width].astype(bool)
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+class BitBoard:
+    """Represents a goban where the stones of each color are stored in a single Python int
+
+    The rules and the public interface are the ones of :class:`Board`, so players and :func:`run_game` work on both.
+    Groups, liberties and captures are computed with shifts and masks over whole bitboards,
+    and cloning only copies a few ints, which suits search players that copy the board a lot.
+
+    Note:
+        Territories are not tracked, so :func:`Board.territories` and :func:`Board.undo` are not available.
+        Positions have the same hash as on :class:`Board`.
+    """
+    def __init__(self, *, size: Union[int, tuple[int, int]] = 19, show: bool = False):
+        """
+        Args:
+            size: The size of the board, either an int for a square board, or a tuple (height, width)
+            show: Indicates if the board should be displayed after each move"""
+        self.show: bool = show
+        self._init_from_grid(np.full(_shape_of(size), Color.Empty.value, dtype=np.int8))
+        self._players: dict[Color, Player] = {}
+        self._current_player: Optional[Player] = None
+        self._stats: Optional[dict[str, list]] = None
+        self._hooks: dict[str, list] = {}
+
+    def _init_from_grid(self, grid: np.ndarray) -> None:
+        self._shape: tuple[int, int] = grid.shape
+        self._stride: int = grid.shape[1] + 1
+        self._keys: list[list[int]] = _keys_of(grid.shape)
+        self._neighbours: NeighbourTable = _neighbour_table(grid == Color.Wall.value)
+        self._all: int = _pack(np.ones(grid.shape, dtype=bool))
+        self._valid: int = _pack(grid != Color.Wall.value)
+        self._empty: int = _pack(grid == Color.Empty.value)
+        self._stones: list[int] = [0] + [_pack(grid == c) for c in range(1, max_color + 1)]
+        self._hash: int = 0
+        for c, stones in enumerate(self._stones):
+            self._hash ^= self._group_hash(c, stones)
+        self._history: set[int] = {self._hash}
+        self._passed: bool = False
+        self._prisoners: dict[Color, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+
+    @classmethod
+    def circular(cls, size: Union[int, tuple[int, int]] = 19, show: bool = False) -> BitBoard:
+        """A quick way to generate a circular board using walls, as :func:`Board.circular`
+
+        Args:
+            size: An int denoting the diameter of the circle, or a 2-tuple denoting the two diameter of an oval
+            show: Indicates if the board should be displayed after each move
+
+        Returns:
+            The generated board"""
+        return cls.from_mask(_ellipse_mask(size), show=show)
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, show: bool = False) -> BitBoard:
+        """Initialize an empty board of any shape, vertices outside of the mask are walls
+
+        Args:
+            mask: A 2D boolean array, True where the vertices are playable
+            show: Indicates if the board should be displayed after each move
+
+        Raises:
+            ValueError: The mask is not a 2D array
+
+        Returns:
+            The new created board"""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.ndim != 2:
+            raise ValueError(f"mask must be a 2D array but has {mask.ndim} dimensions")
+        board = cls(size=mask.shape, show=show)
+        board._init_from_grid(np.where(mask, Color.Empty.value, Color.Wall.value).astype(np.int8))
+        return board
+
+    @classmethod
+    def from_grid(cls, grid: np.ndarray) -> BitBoard:
+        """Initialize a board from an 2D array of :class:`Color`
+
+        Args:
+            grid: A 2D array of :class:`Color`, or of their values, representing the state of the board
+
+        Raises:
+            ValueError: The grid contains values which are not colors
+
+        Returns:
+            The new created board"""
+        grid = np.asarray(grid)
+        if grid.dtype == object:
+            grid = np.frompyfunc(lambda c: Color(c).value, 1, 1)(grid)
+        elif not np.isin(grid, color_list).all():
+            raise ValueError("The grid contains values which are not colors")
+        board = cls(size=grid.shape)
+        board._init_from_grid(grid.astype(np.int8))
+        return board
+
+    @classmethod
+    def from_board(cls, board: Board) -> BitBoard:
+        """Initialize a board from the position, the prisoners and the history of a :class:`Board`, without its players
+
+        Args:
+            board: The board to copy
+
+        Returns:
+            The new created board"""
+        new_board = cls(size=board.shape, show=board.show)
+        new_board._init_from_grid(board._grid)
+        new_board._history = set(board._history)
+        new_board._passed = board._passed
+        new_board._prisoners = dict(board._prisoners)
+        return new_board
+
+    def __getitem__(self, name: tuple[int, int]) -> Color:
+        if not (isinstance(name, tuple) and len(name) == 2):
+            raise IndexError("Not a valid indice")
+        x, y = name
+        height, width = self._shape
+        if not (-height <= x < height and -width <= y < width):
+            raise IndexError("Not a valid indice")
+        bit = 1 << ((x % height) * self._stride + y % width)
+        if not self._valid & bit:
+            return Color.Wall
+        return _color_of[next((c for c, stones in enumerate(self._stones) if stones & bit), 0)]
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} width={self._shape[0]} height={self._shape[1]}>"
+
+    next_player = Board.next_player
+    join = Board.join
+    remove_player = Board.remove_player
+    clear_players = Board.clear_players
+    run_game = Board.run_game
+    run_game_async = Board.run_game_async
+    playout = Board.playout
+    winner = Board.winner
+    around = Board.around
+    prisoners = Board.prisoners
+    display = Board.display
+    hash = Board.hash
+    neighbour_table = Board.neighbour_table
+    _verify_color_before_playing = Board._verify_color_before_playing
+    _emit = Board._emit
+    _end_game = Board._end_game
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The (height, width) of the board"""
+        return self._shape
+
+    def clone(self) -> BitBoard:
+        """Returns a copy of the board, sharing the players of the original board"""
+        new_board = copy.copy(self)
+        new_board._stones = list(self._stones)
+        new_board._history = set(self._history)
+        new_board._prisoners = dict(self._prisoners)
+        new_board._players = dict(self._players)
+        return new_board
+
+    def _spread(self, bits: int) -> int:
+        """Returns the vertices next to the given ones"""
+        stride = self._stride
+        return ((bits << 1) | (bits >> 1) | (bits << stride) | (bits >> stride)) & self._valid
+
+    def _flood(self, seed: int, stones: int) -> int:
+        """Returns the group of stones connected to the seed"""
+        group = seed
+        while True:
+            grown = (group | self._spread(group)) & stones
+            if grown == group:
+                return group
+            group = grown
+
+    def _groups(self) -> Generator[tuple[int, int, int], None, None]:
+        """Yields every group of stones as a (color, stones, liberties) tuple"""
+        for c, stones in enumerate(self._stones):
+            while stones:
+                group = self._flood(stones & -stones, stones)
+                stones &= ~group
+                yield c, group, self._spread(group) & self._empty
+
+    def _group_hash(self, color: int, bits: int) -> int:
+        keys = self._keys[color]
+        position = 0
+        while bits:
+            low = bits & -bits
+            position ^= keys[low.bit_length() - 1]
+            bits ^= low
+        return position
+
+    def _captures(self, bit: int, color: Color) -> Optional[list[tuple[int, int]]]:
+        """Returns the groups captured by a move as (color, stones) pairs, or None if the move is a suicide"""
+        near = self._spread(bit)
+        empty = self._empty & ~bit
+        captured = []
+        for c, stones in enumerate(self._stones):
+            adjacent = near & stones
+            if not adjacent or c == color.value:
+                continue
+            while adjacent:
+                group = self._flood(adjacent & -adjacent, stones)
+                adjacent &= ~group
+                if not self._spread(group) & empty:
+                    captured.append((c, group))
+        if not captured and not near & self._empty:
+            own = self._stones[color.value] | bit
+            if not self._spread(self._flood(bit, own)) & empty:
+                return None
+        return captured
+
+    def _check(self, x: int, y: int, color: Color) -> Optional[tuple[int, list[tuple[int, int]], int]]:
+        """Returns the bit, the captured groups and the next hash of a legal move, None for an illegal move"""
+        if not color.is_player():
+            raise ValueError(f"{color.name} is not a player color")
+        if not (0 <= x < self._shape[0] and 0 <= y < self._shape[1]):
+            raise IndexError("Not a valid indice")
+        bit = 1 << (x * self._stride + y)
+        if not self._empty & bit:
+            return None
+        captured = self._captures(bit, color)
+        if captured is None:
+            return None
+        position = self._hash ^ self._keys[color.value][bit.bit_length() - 1]
+        for c, group in captured:
+            position ^= self._group_hash(c, group)
+        if position in self._history:
+            return None
+        return bit, captured, position
+
+    def is_playable(self, x: int, y: int, color: Color) -> bool:
+        """Checks if a move is valid, with the rules of :func:`Board.is_playable`
+
+        Args:
+            x: The x coordinate to check
+            y: The y coordinate to check
+            color: The color of the player to check
+
+        Returns:
+            Indicates if the move is valid"""
+        return self._check(x, y, color) is not None
+
+    def playable_moves(self, color: Color) -> list[tuple[int, int]]:
+        """ Gives the list of valid move for a given color
+
+        Args:
+            color: The player
+
+        Returns:
+            A list of all vertices where the player can play"""
+        if not color.is_player():
+            raise ValueError(f"{color.name} is not a player color")
+        safe = 0
+        atari: dict[int, list[tuple[int, int]]] = {}
+        for c, group, liberties in self._groups():
+            if c == color.value:
+                if liberties & (liberties - 1):
+                    safe |= group
+            elif liberties and not liberties & (liberties - 1):
+                atari.setdefault(liberties, []).append((c, group))
+        keys = self._keys[color.value]
+        moves = []
+        free = self._empty | safe
+        empty = self._empty
+        while empty:
+            low = empty & -empty
+            empty ^= low
+            captured = atari.get(low)
+            if captured or self._spread(low) & free:
+                index = low.bit_length() - 1
+                position = self._hash ^ keys[index]
+                for c, group in captured or ():
+                    position ^= self._group_hash(c, group)
+                if position not in self._history:
+                    moves.append(divmod(index, self._stride))
+        return moves
+
+    def legal_mask(self, color: Color) -> np.ndarray:
+        """Computes the validity of every move of a color at once
+
+        Args:
+            color: The color of the player to check
+
+        Returns:
+            A boolean array of the shape of the board, True where the player can play"""
+        mask = np.zeros(self._shape, dtype=bool)
+        moves = self.playable_moves(color)
+        if moves:
+            mask[tuple(zip(*moves))] = True
+        return mask
+
+    def play(self, x: int, y: int, *, color: Color) -> None:
+        """Play a move manually without using Player object
+
+        Args:
+            x: The x coordinate of the move to play
+            y: The y coordinate of the move to play
+            color: The color of the move to play
+
+        Raises:
+            ValueError: The move is invalid, or it's the wrong player"""
+        self._verify_color_before_playing(color)
+        move = self._check(x, y, color)
+        if move is None:
+            raise ValueError('You cannot play here')
+        bit, captured, self._hash = move
+        self._stones[color.value] |= bit
+        self._empty &= ~bit
+        for c, group in captured:
+            self._stones[c] &= ~group
+            self._empty |= group
+            self._prisoners[color] = self._prisoners.get(color, 0) + _popcount(group)
+        self._history.add(self._hash)
+        self._matrix = None
+        self._passed = False
+        if self._players:
+            self._current_player = self.next_player()
+        if self.show:
+            self.display()
+
+    def skip(self, *, color: Color) -> bool:
+        """Skip a turn manually without using Player object
+
+        Args:
+            color: The color of the move to play
+
+        Raises:
+            ValueError: It's the wrong player
+
+        Returns:
+            True if the game is over because it's the second skip in a row, False otherwise"""
+        self._verify_color_before_playing(color)
+        if self._passed and self._empty != self._all:
+            return True
+        if self._players:
+            self._current_player = self.next_player()
+        self._passed = True
+        if self.show:
+            self.display()
+        return False
+
+    def matrix(self) -> np.ndarray:
+        """Returns the current state of the board as a read-only numpy matrix of :class:`Color` values"""
+        if self._matrix is None:
+            grid = np.where(_unpack(self._valid, self._shape), Color.Empty.value, Color.Wall.value).astype(np.int8)
+            for c, stones in enumerate(self._stones):
+                if stones:
+                    grid[_unpack(stones, self._shape)] = c
+            grid.flags.writeable = False
+            self._matrix = grid
+        return self._matrix
+
+    def vertices(self, color: Color) -> list[tuple[int, int]]:
+        """Get all vertices from a given color
+
+        Args:
+            color: The color of the vertices to get
+
+        Returns:
+            The list of vertices"""
+        return [(x, y) for x, y in np.argwhere(self.matrix() == color.value).tolist()]
+
+    def score(self, color: Color) -> int:
+        """Returns the score of a player, computed as in :func:`Board.score`
+
+        Args:
+            color: The color of the player
+
+        Returns:
+             The score of the given player"""
+        if not color.is_player():
+            return self._prisoners.get(color, 0) + int(np.count_nonzero(self.matrix() == color.value))
+        return self._prisoners.get(color, 0) + _popcount(self._stones[color.value])
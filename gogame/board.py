@@ -1,26 +1,182 @@
 from __future__ import annotations
+import asyncio
+import copy
+import functools
+import inspect
 import numpy as np
+import random
 import warnings
 import time
-from matplotlib import pyplot as plt
-from matplotlib.colors import ListedColormap
 from typing import (
+    AbstractSet,
+    Callable,
+    Iterable,
     Optional,
     Union,
     Generator,
+    NamedTuple,
+    Sequence,
     TYPE_CHECKING
 )
 
 from .territory import Territory
 from .enum import Color
+from .playout import _playout, _replay
 
 if TYPE_CHECKING:
     from .player import Player
 
-cmap = ListedColormap(["red", (0.59, 0.44, 0.2), "black", "white", "green", "blue", "yellow", "purple", "pink", "orange"])
 color_list = [c.value for c in Color]
 max_color = max(color_list)
 min_color = min(color_list)
+_color_of = {c.value: c for c in Color}
+_zobrist_tables: dict[tuple[int, int], np.ndarray] = {}
+_zobrist_keys: dict[tuple[int, int], list[list[int]]] = {}
+_neighbour_cache_size = 16
+feature_planes = ('own', 'opponent', 'empty', 'liberties_1', 'liberties_2', 'liberties_3', 'age', 'ko', 'legal')
+_max_age = 255
+profiled_phases = ('validation', 'is_playable', 'update', 'merge', 'captures', 'display', 'playable_moves', 'player')
+
+
+def _zobrist_table(shape: tuple[int, int]) -> np.ndarray:
+    if shape not in _zobrist_tables:
+        rng = np.random.default_rng(shape)
+        table = rng.integers(0, np.iinfo(np.uint64).max, size=(max_color + 1, *shape), dtype=np.uint64, endpoint=True)
+        table[Color.Empty.value] = 0
+        _zobrist_tables[shape] = table
+        _zobrist_keys[shape] = table.reshape(max_color + 1, -1).tolist()
+    return _zobrist_tables[shape]
+
+
+class NeighbourTable(NamedTuple):
+    """The neighbours of every vertice of a board, vertices being flat indices `x * width + y`
+
+    Playable vertices are linked to their playable neighbours and walls to the nearby walls.
+    The tables of the most recently used shapes and wall layouts are cached and shared by the boards, so they are read-only.
+
+    Attributes:
+        table: An array of shape `(height * width, 4)`, the neighbours of each vertice padded with -1
+        indptr: The CSR index pointers, the neighbours of `v` are `indices[indptr[v]:indptr[v + 1]]`
+        indices: The CSR neighbour indices
+        lists: The neighbours of each vertice as a tuple of ints, for loops in Python
+        diagonals: The playable diagonal neighbours of each vertice as a tuple of ints, used by :func:`Board.playout`
+    """
+    table: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    lists: tuple[tuple[int, ...], ...]
+    diagonals: tuple[tuple[int, ...], ...]
+
+
+def _neighbour_table(walls: np.ndarray) -> NeighbourTable:
+    return _cached_neighbour_table(walls.shape, np.packbits(walls).tobytes())
+
+
+@functools.lru_cache(maxsize=_neighbour_cache_size)
+def _cached_neighbour_table(shape: tuple[int, int], packed: bytes) -> NeighbourTable:
+    """Builds the table of a wall layout given as packed bits, keeping only the most recently used layouts"""
+    walls = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=shape[0] * shape[1]).astype(bool).reshape(shape)
+    index = np.arange(walls.size).reshape(walls.shape)
+    up, down, left, right = _neighbours(index, -1)
+    table = np.stack([up.ravel(), left.ravel(), down.ravel(), right.ravel()], axis=1)
+    linked = (table >= 0) & (walls.ravel()[table] == walls.ravel()[:, np.newaxis])
+    order = np.argsort(~linked, axis=1, kind='stable')
+    table = np.where(np.take_along_axis(linked, order, axis=1), np.take_along_axis(table, order, axis=1), -1)
+    indptr = np.concatenate([[0], np.cumsum(np.count_nonzero(linked, axis=1))])
+    indices = table[table >= 0]
+    lists = tuple(tuple(n.tolist()) for n in np.split(indices, indptr[1:-1]))
+
+    padded = np.pad(index, 1, constant_values=-1)
+    corners = np.stack([padded[:-2, :-2].ravel(), padded[:-2, 2:].ravel(), padded[2:, :-2].ravel(), padded[2:, 2:].ravel()],
+                       axis=1)
+    playable = (corners >= 0) & ~walls.ravel()[corners]
+    counts = np.count_nonzero(playable, axis=1)
+    diagonals = tuple(tuple(n.tolist()) for n in np.split(corners[playable], np.cumsum(counts)[:-1]))
+    for array in (table, indptr, indices):
+        array.flags.writeable = False
+    return NeighbourTable(table, indptr, indices, lists, diagonals)
+
+
+class _Move(NamedTuple):
+    vertice: Optional[tuple[int, int]]
+    color: Color
+    hash: int
+    passed: bool
+    player: Optional[Player]
+    empty: Optional[Territory] = None
+    territory: Optional[Territory] = None
+    created: bool = False
+    merged: Sequence[Territory] = ()
+    freedom: AbstractSet[int] = frozenset()
+    opponents: Sequence[Territory] = ()
+    captured: Sequence[tuple[Territory, Color, int]] = ()
+    freed: Sequence[tuple[Territory, int]] = ()
+
+
+def _lap(stats: dict[str, list], phase: str, start: float) -> float:
+    """Adds the time elapsed since `start` to a phase of the profiling counters and returns the current time"""
+    now = time.perf_counter()
+    counter = stats[phase]
+    counter[0] += 1
+    counter[1] += now - start
+    return now
+
+
+def _shape_of(size: Union[int, tuple[int, int]]) -> tuple[int, int]:
+    if isinstance(size, int):
+        return size, size
+    elif isinstance(size, (tuple, list, np.ndarray)):
+        if len(size) == 2:
+            return int(size[0]), int(size[1])
+        else:
+            raise TypeError(f"size must be a 2-tuple but is of len {len(size)}")
+    else:
+        raise TypeError(f"size must be of type int or tuple but is of type {size.__class__.__name__}")
+
+
+def _ellipse_mask(size: Union[int, tuple[int, int]]) -> np.ndarray:
+    """Returns the mask of the vertices inside the ellipse inscribed in a board"""
+    height, width = _shape_of(size)
+    middle_x, middle_y = height / 2, width / 2
+    x, y = np.ogrid[:height, :width]
+    return ((x - middle_x + 0.5) / middle_x)**2 + ((y - middle_y + 0.5) / middle_y)**2 <= 1
+
+
+def _neighbours(array: np.ndarray, fill) -> list[np.ndarray]:
+    """Returns the four arrays of the neighbour values of each vertice, vertices out of the board take the value `fill`"""
+    padded = np.pad(array, [(0, 0)] * (array.ndim - 2) + [(1, 1), (1, 1)], constant_values=fill)
+    return [padded[..., :-2, 1:-1], padded[..., 2:, 1:-1], padded[..., 1:-1, :-2], padded[..., 1:-1, 2:]]
+
+
+def _label(grids: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Labels the connected regions of vertices of the same value inside a mask, works on a board or a stack of boards
+
+    Each region takes the flat index of its first vertice as label, vertices outside the mask are labelled -1"""
+    vertical = mask[..., 1:, :] & mask[..., :-1, :] & (grids[..., 1:, :] == grids[..., :-1, :])
+    horizontal = mask[..., :, 1:] & mask[..., :, :-1] & (grids[..., :, 1:] == grids[..., :, :-1])
+    labels = np.where(mask, np.arange(grids.size, dtype=np.int32).reshape(grids.shape), -1)
+    inside = np.flatnonzero(mask)
+    unset = np.iinfo(np.int32).max
+    while True:
+        new_labels = labels.copy()
+        np.minimum(new_labels[..., 1:, :], np.where(vertical, labels[..., :-1, :], unset), out=new_labels[..., 1:, :])
+        np.minimum(new_labels[..., :-1, :], np.where(vertical, labels[..., 1:, :], unset), out=new_labels[..., :-1, :])
+        np.minimum(new_labels[..., :, 1:], np.where(horizontal, labels[..., :, :-1], unset), out=new_labels[..., :, 1:])
+        np.minimum(new_labels[..., :, :-1], np.where(horizontal, labels[..., :, 1:], unset), out=new_labels[..., :, :-1])
+        flat = new_labels.ravel()
+        flat[inside] = flat[flat[inside]]
+        if np.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
+
+
+def _nearby(mask: np.ndarray) -> np.ndarray:
+    nearby = np.zeros_like(mask)
+    nearby[..., 1:, :] |= mask[..., :-1, :]
+    nearby[..., :-1, :] |= mask[..., 1:, :]
+    nearby[..., :, 1:] |= mask[..., :, :-1]
+    nearby[..., :, :-1] |= mask[..., :, 1:]
+    return nearby
 
 
 class Board:
@@ -38,22 +194,25 @@ class Board:
         Args:
             size: The size of the board, either an int for a square board, or a tuple (height, width)
             show: Indicates if the board should be displayed after each move"""
-        if isinstance(size, int):
-            height, width = size, size
-        elif isinstance(size, (tuple, list, np.ndarray)):
-            if len(size) == 2:
-                height, width = size
-            else:
-                raise TypeError(f"size must be a 2-tuple but is of len {len(size)}")
-        else:
-            raise TypeError(f"size must be of type int or tuple but is of type {size.__class__.__name__}")
         self.show: bool = show
-        self._grid: np.ndarray = np.full((height, width), Color.Empty)
-        self._last_grid: np.ndarray = np.copy(self._grid)
+        self._grid: np.ndarray = np.full(_shape_of(size), Color.Empty.value, dtype=np.int8)
+        self._matrix: Optional[np.ndarray] = None
+        self._zobrist: np.ndarray = _zobrist_table(self._grid.shape)
+        self._keys: list[list[int]] = _zobrist_keys[self._grid.shape]
+        self._hash: int = 0
+        self._history: set[int] = {self._hash}
+        self._passed: bool = False
+        self._moves: list[_Move] = []
         self._current_player: Optional[Player] = None
-        self._territories: list[Territory] = [Territory(x=0, y=0, board=self)]
+        self._neighbours: NeighbourTable
+        self._labels: np.ndarray
+        self._territories: dict[int, Territory]
+        self._next_id: int
+        self._init_region(np.ones(self._grid.shape, dtype=bool))
         self._players: dict[Color, Player] = {}
         self._prisoners: dict[Color, int] = {}
+        self._stats: Optional[dict[str, list]] = None
+        self._hooks: dict[str, list[Callable]] = {}
 
     @classmethod
     def circular(cls, size: Union[int, tuple[int, int]] = 19, show: bool = False) -> Board:
@@ -66,20 +225,32 @@ class Board:
         Returns:
             The generated board
         """
-        board = cls(size=size, show=show)
-        middle_x = board._grid.shape[0] / 2
-        middle_y = board._grid.shape[1] / 2
-        for x in range(board._grid.shape[0]):
-            for y in range(board._grid.shape[1]):
-                if (((x - middle_x + 0.5) / middle_x)**2 + ((y - middle_y + 0.5) / middle_y)**2) > 1:
-                    board._grid[x, y] = Color.Wall
-                    board._territories[0]._vertices.remove((x, y))
+        return cls.from_mask(_ellipse_mask(size), show=show)
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, show: bool = False) -> Board:
+        """Initialize an empty board of any shape, vertices outside of the mask are walls
+
+        Args:
+            mask: A 2D boolean array, True where the vertices are playable
+            show: Indicates if the board should be displayed after each move
+
+        Raises:
+            ValueError: The mask is not a 2D array
+
+        Returns:
+            The new created board"""
+        mask = np.asarray(mask, dtype=bool)
+        if mask.ndim != 2:
+            raise ValueError(f"mask must be a 2D array but has {mask.ndim} dimensions")
+        board = cls(size=mask.shape, show=show)
+        board._init_region(mask)
         return board
 
     def __getitem__(self, name: tuple[int, int]) -> Color:
         if not (isinstance(name, tuple) and len(name) == 2):
             raise IndexError("Not a valid indice")
-        return self._grid[name]
+        return _color_of[int(self._grid[name])]
 
     def __repr__(self):
         return f"<{self.__class__.__name__} width={self._grid.shape[0]} height={self._grid.shape[1]}>"
@@ -150,39 +321,253 @@ class Board:
         """Initialize a board from an 2D array of :class:`Color`
 
         Args:
-            grid: A 2D array of :class:`Color` representing the state of the board
+            grid: A 2D array of :class:`Color`, or of their values, representing the state of the board
+
+        Raises:
+            ValueError: The grid contains values which are not colors
 
         Returns:
             The new created board"""
-        new_board = cls()
-        new_board._grid = grid
-        new_board._last_grid = np.full(grid.shape, Color.Empty)
+        grid = np.asarray(grid)
+        if grid.dtype == object:
+            grid = np.frompyfunc(lambda c: Color(c).value, 1, 1)(grid)
+        elif not np.isin(grid, color_list).all():
+            raise ValueError("The grid contains values which are not colors")
+        new_board = cls(size=grid.shape)
+        new_board._grid = np.array(grid, dtype=np.int8)
+        new_board._hash = new_board._compute_hash()
+        new_board._history = {new_board._hash}
         new_board._init_territories()
         return new_board
 
     def clone(self) -> Board:
-        """Returns a deep copy of the board"""
-        new_board = Board()
-        new_board.show = self.show
+        """Returns a deep copy of the board, without the history of moves which can be undone"""
+        new_board = copy.copy(self)
         new_board._grid = np.copy(self._grid)
+        new_board._matrix = None
+        new_board._history = set(self._history)
+        new_board._moves = []
         new_board._players = dict(self._players)
-        new_board._territories = [t.clone(new_board) for t in self._territories]
+        new_board._prisoners = dict(self._prisoners)
+        new_board._labels = np.copy(self._labels)
+        new_board._territories = {i: t.clone(new_board) for i, t in self._territories.items()}
+        new_board.profiling = self.profiling
+        new_board._hooks = {}
         return new_board
 
+    def _init_region(self, mask: np.ndarray) -> None:
+        """Fills the board with walls outside of a mask and makes a single empty territory of the inside"""
+        self._grid[...] = np.where(mask, Color.Empty.value, Color.Wall.value)
+        self._neighbours = _neighbour_table(~mask)
+        self._labels = np.where(mask, 0, -1).astype(np.int32)
+        self._territories = {}
+        self._next_id = 1
+        if mask.any():
+            self._territories[0] = Territory._from_state(board=self,
+                                                         id=0,
+                                                         color=Color.Empty,
+                                                         vertices=set(np.flatnonzero(mask).tolist()),
+                                                         freedom=set(),
+                                                         hash=0)
+
     def _init_territories(self) -> None:
-        self._territories = []
-        for x in range(self._grid.shape[0]):
-            for y in range(self._grid.shape[1]):
-                if not any((x, y) in t.vertices for t in self._territories):
-                    self._territories.append(Territory(x=x, y=y, board=self))
+        grid = self._grid
+        self._neighbours = _neighbour_table(grid == Color.Wall.value)
+        labels = _label(grid, np.ones(grid.shape, dtype=bool)).ravel()
+        order = np.argsort(labels, kind='stable')
+        roots, starts = np.unique(labels[order], return_index=True)
+        x, y = np.divmod(order, grid.shape[1])
+        stones = grid.ravel()[order] > 0
+        keys = np.where(stones, self._zobrist[grid.ravel()[order].clip(0), x, y], np.uint64(0))
+        hashes = np.bitwise_xor.reduceat(keys, starts).tolist()
+
+        index = np.arange(grid.size).reshape(grid.shape)
+        pairs = []
+        for empty, neighbour in zip(_neighbours(grid == Color.Empty.value, False), _neighbours(index, -1)):
+            mask = (grid > 0) & empty
+            pairs.append(labels[index[mask]] * np.int64(grid.size) + neighbour[mask])
+        pairs = np.unique(np.concatenate(pairs))
+        liberties = np.split(pairs % grid.size, np.searchsorted(pairs // grid.size, roots[1:]))
+        lookup = np.zeros(grid.size, dtype=np.int32)
+        lookup[roots] = np.arange(len(roots), dtype=np.int32)
+
+        self._labels = lookup[labels].reshape(grid.shape)
+        self._territories = {}
+        self._next_id = len(roots)
+        for i, (vertices, freedom) in enumerate(zip(np.split(order, starts[1:]), liberties)):
+            color = _color_of[int(grid.flat[vertices[0]])]
+            self._territories[i] = Territory._from_state(
+                board=self,
+                id=i,
+                color=color,
+                vertices=set(vertices.tolist()),
+                freedom=set(freedom.tolist()),
+                hash=hashes[i] if color.is_player() else 0)
+
+    def _add_territory(self, territory: Territory) -> None:
+        territory._id = self._next_id
+        self._next_id += 1
+        self._territories[territory._id] = territory
+        self._labels.flat[list(territory._vertices)] = territory._id
+
+    def _compute_hash(self) -> int:
+        x, y = np.nonzero(self._grid > 0)
+        return int(np.bitwise_xor.reduce(self._zobrist[self._grid[x, y], x, y], initial=np.uint64(0)))
+
+    def _hash_after(self, x: int, y: int, color: Color) -> int:
+        vertice = x * self._grid.shape[1] + y
+        position = self._hash ^ self._keys[color.value][vertice]
+        for t in self._neighbour_territories(vertice):
+            if t.color.is_player() and t.color is not color and len(t._freedom) <= 1:
+                position ^= t._hash
+        return position
+
+    def _neighbour_territories(self, vertice: int) -> list[Territory]:
+        labels = self._labels.ravel()
+        territories = []
+        for k in self._neighbours.lists[vertice]:
+            label = labels[k]
+            if label >= 0:
+                t = self._territories[label]
+                if t not in territories:
+                    territories.append(t)
+        return territories
 
     def display(self) -> None:
-        """Displays the board as a numpy matrix"""
-        plt.imshow(self.matrix(), cmap=cmap, vmin=min_color, vmax=max_color)
-        plt.pause(0.1)
+        """Displays the board as a numpy matrix, this requires matplotlib"""
+        from .display import display
+        display(self)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The (height, width) of the board"""
+        return self._grid.shape
+
+    @property
+    def neighbour_table(self) -> NeighbourTable:
+        """The precomputed neighbours of every vertice, shared by the boards of the same shape and walls"""
+        return self._neighbours
+
+    @property
+    def hash(self) -> int:
+        """The 64-bit Zobrist hash of the current position"""
+        return self._hash
+
+    @property
+    def profiling(self) -> bool:
+        """Whether the board records the number of calls and the time spent in each phase of its operations,
+        see :func:`stats`. Disabled by default, enabling it resets the counters"""
+        return self._stats is not None
+
+    @profiling.setter
+    def profiling(self, enabled: bool) -> None:
+        self._stats = {phase: [0, 0.] for phase in profiled_phases} if enabled else None
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Returns a snapshot of the profiling counters, enabled with :attr:`profiling`
+
+        The phases, listed in :data:`profiled_phases`, are the steps of :func:`play`: the checks of the color
+        (`validation`) and of the move (`is_playable`), the update of the stone, the empty territory and the hash
+        (`update`), the merge of the friendly groups (`merge`), the capture sweep (`captures`) and :func:`display`,
+        plus the calls to :func:`playable_moves` and the time spent in :func:`Player.play` during :func:`run_game`,
+        board methods called by the players included.
+
+        Raises:
+            ValueError: Profiling is disabled
+
+        Returns:
+            The number of `calls` and the cumulated `time` in seconds of each phase"""
+        if self._stats is None:
+            raise ValueError("Profiling is disabled, set Board.profiling to True first")
+        return {phase: {'calls': calls, 'time': spent} for phase, (calls, spent) in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Sets all the profiling counters back to zero
+
+        Raises:
+            ValueError: Profiling is disabled"""
+        if self._stats is None:
+            raise ValueError("Profiling is disabled, set Board.profiling to True first")
+        self.profiling = True
+
+    def _subscribe(self, event: str, callback: Callable) -> Callable:
+        self._hooks.setdefault(event, []).append(callback)
+        return callback
+
+    def on_move(self, callback: Callable[[int, Color], None]) -> Callable[[int, Color], None]:
+        """Subscribes a callback called after each stone played with :func:`play`, it can be used as a decorator
+
+        The callback receives the flat index `x * width + y` of the stone and its color.
+
+        Args:
+            callback: The function to call
+
+        Returns:
+            The callback"""
+        return self._subscribe('move', callback)
+
+    def on_capture(self, callback: Callable[[int, Color, list[int]], None]) -> Callable[[int, Color, list[int]], None]:
+        """Subscribes a callback called after each move capturing stones, after the callbacks of :func:`on_move`
+
+        The callback receives the flat index of the move, its color and the sorted flat indices of the captured stones.
+
+        Args:
+            callback: The function to call
+
+        Returns:
+            The callback"""
+        return self._subscribe('capture', callback)
+
+    def on_pass(self, callback: Callable[[Color], None]) -> Callable[[Color], None]:
+        """Subscribes a callback called after each skip recorded by :func:`skip`, it receives the color of the player
+
+        Args:
+            callback: The function to call
+
+        Returns:
+            The callback"""
+        return self._subscribe('pass', callback)
+
+    def on_game_end(self, callback: Callable[[Optional[Color]], None]) -> Callable[[Optional[Color]], None]:
+        """Subscribes a callback called when a game ends, on the second skip in a row or at the limits of :func:`run_game`
+
+        The callback receives the color of the winner, as :func:`winner`, or None when no player is linked to the board.
+
+        Args:
+            callback: The function to call
+
+        Returns:
+            The callback"""
+        return self._subscribe('game_end', callback)
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Removes a callback from all the events it is subscribed to
+
+        Args:
+            callback: The callback to remove
+
+        Raises:
+            ValueError: The callback is not subscribed"""
+        found = False
+        for event, callbacks in list(self._hooks.items()):
+            while callback in callbacks:
+                callbacks.remove(callback)
+                found = True
+            if not callbacks:
+                del self._hooks[event]
+        if not found:
+            raise ValueError(f"{callback!r} is not subscribed to the board")
+
+    def _emit(self, event: str, *payload) -> None:
+        for callback in tuple(self._hooks.get(event, ())):
+            callback(*payload)
+
+    def _end_game(self) -> None:
+        if 'game_end' in self._hooks:
+            self._emit('game_end', self.winner().color if self._players else None)
 
     def is_playable(self, x: int, y: int, color: Color) -> bool:
-        """Checks if a move is valid
+        """Checks if a move is valid, a move cannot repeat a previous position of the game (positional superko)
 
         Args:
             x: The x coordinate to check
@@ -193,29 +578,142 @@ class Board:
             Indicates if the move is valid"""
         if not color.is_player():
             raise ValueError(f"{color.name} is not a player color")
-        if self[x, y] is not Color.Empty:
-            return False
-        grid = np.copy(self._grid)
-        grid[x, y] = color
-        if np.all(grid is self._last_grid):
-            if np.all(self._last_grid is self._grid):
-                return True
-            return False
-        mine = []
-        opponent = []
-        for i, j in self.around(x, y):
-            if t := self.get_territory(i, j):
-                if t.color is color:
-                    mine.append(t)
-                elif t.color is not Color.Empty:
-                    opponent.append(t)
-        if any(not t._hypothetical_freedom(x, y, color) for t in opponent):
-            return True
-        if len(opponent) == len(list(self.around(x, y))):
+        if self._grid[x, y] != Color.Empty.value:
             return False
-        if mine and all(not t._hypothetical_freedom(x, y, color) for t in mine):
+        grid, labels = self._grid.ravel(), self._labels.ravel()
+        for k in self._neighbours.lists[x * self._grid.shape[1] + y]:
+            if grid[k] == Color.Empty.value:
+                break
+            t = self._territories[labels[k]]
+            if t.color is color:
+                if len(t._freedom) > 1:
+                    break
+            elif len(t._freedom) <= 1:
+                break
+        else:
             return False
-        return True
+        return self._hash_after(x, y, color) not in self._history
+
+    def legal_mask(self, color: Color) -> np.ndarray:
+        """Computes the validity of every move of a color at once
+
+        Args:
+            color: The color of the player to check
+
+        Returns:
+            A boolean array of the shape of the board, True where the player can play"""
+        if not color.is_player():
+            raise ValueError(f"{color.name} is not a player color")
+        mask, repeated = self._legal_masks(color, self._liberties())
+        return mask & ~repeated
+
+    def _liberties(self) -> np.ndarray:
+        """Returns the number of liberties of the group of each stone, 0 on the other vertices"""
+        liberties = np.zeros(self._next_id + 1, dtype=np.int32)
+        for i, t in self._territories.items():
+            if t.color.is_player():
+                liberties[i] = len(t._freedom)
+        return liberties[self._labels]
+
+    def _legal_masks(self, color: Color, liberties: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the vertices where a move is allowed without the superko rule, and the ones repeating a position"""
+        stones = self._grid > 0
+        friend = (self._grid == color.value) & (liberties > 1)
+        capture = stones & (self._grid != color.value) & (liberties <= 1)
+        mask = _nearby(self._grid == Color.Empty.value) | _nearby(friend) | _nearby(capture)
+        mask &= self._grid == Color.Empty.value
+        history = np.fromiter(self._history, dtype=np.uint64, count=len(self._history))
+        repeated = np.isin(self._zobrist[color.value] ^ np.uint64(self._hash), history)
+        for x, y in np.argwhere(mask & _nearby(capture)).tolist():
+            repeated[x, y] = self._hash_after(x, y, color) in self._history
+        return mask, repeated
+
+    def features(self,
+                 out: Optional[np.ndarray] = None,
+                 planes: Iterable[str] = feature_planes,
+                 color: Optional[Color] = None
+                 ) -> np.ndarray:
+        """Writes input planes for a neural network, seen from a player, in a buffer
+
+        The available planes, listed in :data:`feature_planes`, are:
+
+        - `own`, `opponent`, `empty`: 1 on the stones of the player, on the stones of the other players, on empty vertices
+        - `liberties_1`, `liberties_2`, `liberties_3`: 1 on the stones whose group has 1, 2, or 3 and more liberties
+        - `age`: the number of moves since each stone was played, 1 for the last move, capped at 255,
+          stones placed before the moves which can be undone count as 255
+        - `ko`: 1 where the player cannot play only because it would repeat a previous position
+        - `legal`: 1 where the player can play, as :func:`legal_mask`
+
+        Args:
+            out: A `(planes, height, width)` array where to write the planes, float32 or uint8 for example,
+                a new float32 array by default
+            planes: The names of the planes, in order
+            color: The color of the player, the current player by default
+
+        Raises:
+            ValueError: The color is not a player or no color is given without a current player,
+                a plane is unknown, or the buffer has the wrong shape
+
+        Returns:
+            The buffer holding the planes"""
+        if color is None:
+            if self._current_player is None:
+                raise ValueError("The board has no current player, a color must be given")
+            color = self._current_player.color
+        if not color.is_player():
+            raise ValueError(f"{color.name} is not a player color")
+        planes = list(planes)
+        for name in planes:
+            if name not in feature_planes:
+                raise ValueError(f"Unknown feature plane {name!r}, expected one of {feature_planes}")
+        shape = (len(planes), *self._grid.shape)
+        if out is None:
+            out = np.zeros(shape, dtype=np.float32)
+        elif out.shape != shape:
+            raise ValueError(f"The buffer has shape {out.shape} instead of {shape}")
+        grid = self._grid
+        liberties = None
+        masks = None
+        for plane, name in zip(out, planes):
+            if name == 'own':
+                np.equal(grid, color.value, out=plane, casting='unsafe')
+            elif name == 'opponent':
+                np.logical_and(grid > 0, grid != color.value, out=plane, casting='unsafe')
+            elif name == 'empty':
+                np.equal(grid, Color.Empty.value, out=plane, casting='unsafe')
+            elif name.startswith('liberties'):
+                if liberties is None:
+                    liberties = self._liberties()
+                if name == 'liberties_3':
+                    np.greater_equal(liberties, 3, out=plane, casting='unsafe')
+                else:
+                    np.equal(liberties, int(name[-1]), out=plane, casting='unsafe')
+            elif name == 'age':
+                self._ages(plane)
+            else:
+                if masks is None:
+                    masks = self._legal_masks(color, self._liberties() if liberties is None else liberties)
+                mask, repeated = masks
+                if name == 'ko':
+                    np.logical_and(mask, repeated, out=plane, casting='unsafe')
+                else:
+                    np.logical_and(mask, ~repeated, out=plane, casting='unsafe')
+        return out
+
+    def _ages(self, plane: np.ndarray) -> None:
+        """Writes the number of moves since each stone was played in a plane"""
+        width = self._grid.shape[1]
+        grid = self._grid.ravel().tolist()
+        ages = [_max_age if value > 0 else 0 for value in grid]
+        seen = set()
+        for age, move in enumerate(reversed(self._moves[-_max_age:]), 1):
+            vertice = move.vertice
+            if vertice is not None and vertice not in seen:
+                seen.add(vertice)
+                i = vertice[0] * width + vertice[1]
+                if _color_of[grid[i]] is move.color:
+                    ages[i] = age
+        plane[...] = np.reshape(ages, self._grid.shape)
 
     def playable_moves(self, color: Color) -> list[tuple[int, int]]:
         """ Gives the list of valid move for a given color
@@ -226,13 +724,13 @@ class Board:
         Returns:
             A list of all vertices where the player can play
         """
-        playable = []
-        for t in self._territories:
-            if t.color is Color.Empty:
-                for x, y in t.vertices:
-                    if self.is_playable(x, y, color):
-                        playable.append((x, y))
-        return playable
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter()
+        moves = [(x, y) for x, y in np.argwhere(self.legal_mask(color)).tolist()]
+        if stats is not None:
+            _lap(stats, 'playable_moves', start)
+        return moves
 
     def run_game(self, max_turn: Optional[int] = 1000, max_duration: Optional[int] = None) -> Player:
         """Runs a game on this board between two players. The players have to be linked to the board with :func:`join` before
@@ -254,7 +752,12 @@ class Board:
         c = 0
         starting_time = time.time()
         while (not c or c < max_turn) and (not max_duration or time.time() - starting_time < max_duration):
+            stats = self._stats
+            if stats is not None:
+                start = time.perf_counter()
             move = self._current_player.play()
+            if stats is not None:
+                _lap(stats, 'player', start)
             if move is None:
                 if self.skip(color=self._current_player.color):
                     return self.winner()
@@ -263,8 +766,109 @@ class Board:
             else:
                 raise TypeError("play method must return None or a 2-tuple")
             c += 1
+        self._end_game()
         return self.winner()
 
+    async def run_game_async(self,
+                             max_turn: Optional[int] = 1000,
+                             max_duration: Optional[float] = None,
+                             move_timeout: Optional[float] = None
+                             ) -> Player:
+        """Runs a game as :func:`run_game` inside an event loop, the `play` method of the players can be a coroutine
+
+        Coroutines are cancelled as soon as they exceed a time limit: a move taking more than `move_timeout` seconds
+        is a skip and the game ends after `max_duration` seconds, even in the middle of a move.
+        Many games can run concurrently on the same loop, for example with :func:`asyncio.gather`.
+
+        Note:
+            A `play` method which is not a coroutine blocks the loop while it runs and cannot be interrupted.
+
+        Args:
+            max_turn: The maximum number of move before ending the game
+            max_duration: The maximum number of seconds before ending the game
+            move_timeout: The maximum number of seconds of each move
+
+        Raises:
+            ValueError: Not enough players to start the game
+            TypeError: A player returns an invalid move type
+
+        Returns:
+            The player who wins the game"""
+        if len(self._players) < 2:
+            raise ValueError("The board needs at least two players to be run")
+        if max_turn is None and max_duration is None:
+            warnings.warn("max_turn and max_duration are both to None, game might run forever")
+        loop = asyncio.get_running_loop()
+        deadline = None if max_duration is None else loop.time() + max_duration
+        c = 0
+        while max_turn is None or c < max_turn:
+            timeout = move_timeout
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            player = self._current_player
+            stats = self._stats
+            if stats is not None:
+                start = time.perf_counter()
+            move = player.play()
+            if inspect.isawaitable(move):
+                try:
+                    move = await asyncio.wait_for(move, timeout)
+                except asyncio.TimeoutError:
+                    if deadline is not None and loop.time() >= deadline:
+                        break
+                    move = None
+            if stats is not None:
+                _lap(stats, 'player', start)
+            if move is None:
+                if self.skip(color=player.color):
+                    return self.winner()
+            elif isinstance(move, (tuple, list, np.ndarray)) and len(move) == 2:
+                self.play(*move, color=player.color)
+            else:
+                raise TypeError("play method must return None or a 2-tuple")
+            c += 1
+        self._end_game()
+        return self.winner()
+
+    def playout(self,
+                policy: str = "uniform",
+                max_moves: Optional[int] = None,
+                rng: Optional[Union[int, np.random.Generator]] = None
+                ) -> dict[Color, int]:
+        """Plays random moves from the current position until the end of the game, without changing the board
+
+        Note:
+            The rules are lighter than the ones of :func:`play` to be fast: previous positions are not checked
+            except for the immediate retake of a single stone, and players never fill their own single-point eyes.
+            The colors of the joined players play in turn from the current player, Black and White without players.
+
+        Args:
+            policy: The way moves are chosen, only `"uniform"` is available for now
+            max_moves: The maximum number of moves and skips, default to three times the number of vertices
+            rng: A numpy random generator or a seed
+
+        Raises:
+            ValueError: The policy is unknown
+
+        Returns:
+            The final score of each color, computed as in :func:`score`"""
+        if policy != "uniform":
+            raise ValueError(f"Unknown playout policy {policy!r}")
+        generator = random.Random(int(np.random.default_rng(rng).integers(2**63)))
+        if self._players:
+            colors = sorted(self._players, key=lambda c: c.value)
+            turn = colors.index(self._current_player.color)
+        else:
+            colors, turn = [Color.Black, Color.White], 0
+        if max_moves is None:
+            max_moves = 3 * self.matrix().size
+        grid = self.matrix()
+        return _playout(grid, self._neighbours.lists, self._neighbours.diagonals, colors, turn, self._passed,
+                        self._prisoners, max_moves, generator)
+
     def play(self, x: int, y: int, *, color: Color) -> None:
         """Play a move manually without using Player object
 
@@ -275,37 +879,132 @@ class Board:
 
         Raises:
             ValueError: The move is invalid, or it's the wrong player"""
+        stats = self._stats
+        if stats is not None:
+            start = time.perf_counter()
         self._verify_color_before_playing(color)
+        if stats is not None:
+            start = _lap(stats, 'validation', start)
 
         if not self.is_playable(x, y, color):
             raise ValueError('You cannot play here')
-
-        self._last_grid = np.copy(self._grid)
-        self._grid[x, y] = color
+        if stats is not None:
+            start = _lap(stats, 'is_playable', start)
+
+        previous_hash, previous_player = self._hash, self._current_player
+        vertice = x * self._grid.shape[1] + y
+        self._release_matrix()
+        self._grid[x, y] = color.value
+        self._hash ^= self._keys[color.value][vertice]
         if self._players:
             self._current_player = self.next_player()
 
-        modified = [t for t in self.territories(color) if t.is_touching(x, y)]
-        for t in self._territories:
-            t._update(x, y, color)
-        if len(modified) >= 2:
-            merge_territory = Territory.merge(*modified, with_vertice=(x, y))
-            for t in modified:
-                self._territories.remove(t)
-            self._territories.append(merge_territory)
-
-        for t in self.territories():
-            if t.color.is_player() and (t.color is not color) and not t.freedom():
-                t._color = Color.Empty
-                if color not in self._prisoners:
-                    self._prisoners[color] = 0
-                for i, j in t.vertices:
-                    self._grid[i, j] = Color.Empty
-                    self._prisoners[color] += 1
-
-        if not any(t.includes(x, y, color) for t in self._territories):
-            new_territory = Territory(x=x, y=y, board=self)
-            self._territories.append(new_territory)
+        empty = self._territories[self._labels[x, y]]
+        empty._vertices.discard(vertice)
+        if not empty._vertices:
+            del self._territories[empty._id]
+
+        nearby = self._neighbour_territories(vertice)
+        if stats is not None:
+            start = _lap(stats, 'update', start)
+        friends = [t for t in nearby if t.color is color]
+        merged = []
+        freedom = set()
+        if friends:
+            territory = max(friends, key=lambda t: t.size)
+            for t in friends:
+                if t is not territory:
+                    freedom |= territory._absorb(t)
+                    self._labels.flat[list(t._vertices)] = territory._id
+                    del self._territories[t._id]
+                    merged.append(t)
+            freedom |= territory._add(vertice)
+            self._labels[x, y] = territory._id
+        else:
+            grid = self._grid.ravel()
+            territory = Territory._from_state(board=self,
+                                              id=None,
+                                              color=color,
+                                              vertices={vertice},
+                                              freedom={k for k in self._neighbours.lists[vertice] if grid[k] == Color.Empty.value},
+                                              hash=self._keys[color.value][vertice])
+            self._add_territory(territory)
+        if stats is not None:
+            start = _lap(stats, 'merge', start)
+
+        opponents = [t for t in nearby if t.color.is_player() and t.color is not color]
+        captured = []
+        for t in opponents:
+            t._freedom.discard(vertice)
+            if not t._freedom:
+                captured.append((t, t.color, t._hash))
+        freed = []
+        for t, _, _ in captured:
+            t._color = Color.Empty
+            self._hash ^= t._hash
+            t._hash = 0
+            self._prisoners[color] = self._prisoners.get(color, 0) + t.size
+            self._grid.flat[list(t._vertices)] = Color.Empty.value
+        for t, _, _ in captured:
+            for v in t._vertices:
+                for n in self._neighbour_territories(v):
+                    if n.color.is_player() and v not in n._freedom:
+                        n._freedom.add(v)
+                        freed.append((n, v))
+        self._history.add(self._hash)
+        self._moves.append(_Move((x, y), color, previous_hash, self._passed, previous_player, empty,
+                                 territory, not friends, merged, freedom, opponents, captured, freed))
+        self._passed = False
+        if stats is not None:
+            start = _lap(stats, 'captures', start)
+        if self._hooks:
+            self._emit('move', vertice, color)
+            if captured and 'capture' in self._hooks:
+                self._emit('capture', vertice, color, sorted(v for t, _, _ in captured for v in t._vertices))
+        if self.show:
+            self.display()
+            if stats is not None:
+                _lap(stats, 'display', start)
+
+    def replay(self, moves: Iterable[tuple[Color, Optional[tuple[int, int]]]]) -> None:
+        """Plays a sequence of recorded moves at once, much faster than :func:`play`
+
+        Note:
+            Moves are not checked against the rules, only captures are applied, so they should come from a legal game.
+            Territories are rebuilt once at the end and the moves played before cannot be undone anymore.
+
+        Args:
+            moves: The moves as (color, vertice) pairs, the vertice is None for a skip
+
+        Raises:
+            IndexError: A vertice is out of the board
+            ValueError: A vertice is not empty when it is played"""
+        height, width = self._grid.shape
+        flat = []
+        for color, move in moves:
+            if move is None:
+                flat.append((color.value, -1))
+            else:
+                x, y = move
+                if not (0 <= x < height and 0 <= y < width):
+                    raise IndexError(f"{move} is out of the board")
+                flat.append((color.value, x * width + y))
+        if not flat:
+            return
+        grid, captures, hashes = _replay(self._grid, self._neighbours.lists, self._keys, self._hash, flat)
+        self._grid = np.array(grid, dtype=np.int8).reshape(height, width)
+        self._matrix = None
+        if hashes:
+            self._hash = hashes[-1]
+            self._history.update(hashes)
+        for value, count in captures.items():
+            self._prisoners[_color_of[value]] = self._prisoners.get(_color_of[value], 0) + count
+        self._passed = flat[-1][1] < 0
+        self._moves = []
+        self._init_territories()
+        last = _color_of[flat[-1][0]]
+        if last in self._players:
+            self._current_player = self.next_player(self._players[last])
         if self.show:
             self.display()
 
@@ -322,15 +1021,75 @@ class Board:
             True if the game is over because it's the second skip in a row, False otherwise"""
 
         self._verify_color_before_playing(color)
-        if np.all(self._last_grid == self._grid) and not np.all(self._grid == Color.Empty):
+        if self._passed and self._grid.any():
+            self._end_game()
             return True
+        self._moves.append(_Move(None, color, self._hash, self._passed, self._current_player))
         if self._players:
             self._current_player = self.next_player()
-        self._last_grid = np.copy(self._grid)
+        self._passed = True
+        if self._hooks:
+            self._emit('pass', color)
         if self.show:
             self.display()
         return False
 
+    def undo(self) -> None:
+        """Cancels the last move or skip played on the board
+
+        Raises:
+            ValueError: There is no move to undo"""
+        if not self._moves:
+            raise ValueError("There is no move to undo")
+        move = self._moves.pop()
+        if move.vertice is not None:
+            x, y = move.vertice
+            vertice = x * self._grid.shape[1] + y
+            self._release_matrix()
+            self._history.discard(self._hash)
+            for t, v in reversed(move.freed):
+                t._freedom.discard(v)
+            for t, color, position in move.captured:
+                t._color = color
+                t._hash = position
+                self._prisoners[move.color] -= t.size
+                self._grid.flat[list(t._vertices)] = color.value
+            for t in move.opponents:
+                t._freedom.add(vertice)
+
+            territory = move.territory
+            if move.created:
+                del self._territories[territory._id]
+                self._next_id -= 1
+            else:
+                territory._remove(vertice, move.freedom)
+                for t in reversed(move.merged):
+                    territory._split(t)
+                    self._labels.flat[list(t._vertices)] = t._id
+                    self._territories[t._id] = t
+
+            empty = move.empty
+            empty._vertices.add(vertice)
+            self._territories[empty._id] = empty
+            self._labels[x, y] = empty._id
+            self._grid[x, y] = Color.Empty.value
+        self._hash = move.hash
+        self._passed = move.passed
+        self._current_player = move.player
+        if self.show:
+            self.display()
+
+    def _initial_grid(self) -> np.ndarray:
+        """Returns the grid before the moves which can be undone, computed on a copy of the board"""
+        memo = {id(player): None for player in self._players.values()}
+        memo.update((id(move.player), None) for move in self._moves)
+        memo[id(self._hooks)] = {}
+        start = copy.deepcopy(self, memo)
+        start.show = False
+        while start._moves:
+            start.undo()
+        return start._grid
+
     def _verify_color_before_playing(self, color):
         if not color.is_player():
             raise ValueError(f"{color.name} is not a player color")
@@ -353,7 +1112,10 @@ class Board:
                y: int,
                include_center: bool = False
                ) -> Generator[tuple[int, int], None, None]:
-        """A quick way to get vertices around a given point
+        """A quick way to get vertices around a given point, walls included
+
+        Note:
+            Loops over many vertices should rather use the flat indices of :attr:`neighbour_table`
 
         Args:
             x: The x coordinate of the point
@@ -366,9 +1128,10 @@ class Board:
             yield x - 1, y
         if y > 0:
             yield x, y - 1
-        if x < self._grid.shape[0] - 1:
+        height, width = self.shape
+        if x < height - 1:
             yield x + 1, y
-        if y < self._grid.shape[1] - 1:
+        if y < width - 1:
             yield x, y + 1
         if include_center:
             yield x, y
@@ -386,9 +1149,21 @@ class Board:
     def matrix(self) -> np.ndarray:
         """Returns the current state of the board as a numpy matrix to facilitate move calculation
 
+        Note:
+            The matrix is a read-only array shared with the board until the next move, so calling this method is free.
+            The board then writes its next moves in a new array and the matrix keeps the position it was taken at.
+
         Returns:
-            The matrix representing the board"""
-        return np.vectorize(lambda c: c.value)(self._grid)
+            The matrix of :class:`Color` values representing the board"""
+        if self._matrix is None:
+            self._matrix = self._grid.view()
+            self._matrix.flags.writeable = False
+        return self._matrix
+
+    def _release_matrix(self) -> None:
+        if self._matrix is not None:
+            self._grid = self._grid.copy()
+            self._matrix = None
 
     def territories(self, color: Optional[Color] = None) -> list[Territory]:
         """Returns territories currently on the board. If a color is specified, only territories of the given color are returned
@@ -399,9 +1174,9 @@ class Board:
         Returns:
             A list of territories"""
         if color is None:
-            return self._territories
+            return list(self._territories.values())
         else:
-            return [x for x in self._territories if x.color is color]
+            return [x for x in self._territories.values() if x.color is color]
 
     def get_territory(self,
                       x: int,
@@ -415,10 +1190,7 @@ class Board:
 
         Returns:
             The territory which owns the vertice if any"""
-        for t in self._territories:
-            if t.includes(x, y):
-                return t
-        return None
+        return self._territories.get(self._labels[x, y])
 
     def vertices(self, color: Color) -> list[tuple[int, int]]:
         """Get all vertices from a given color
@@ -428,12 +1200,7 @@ class Board:
 
         Returns:
             The list of vertices"""
-        vertices = []
-        for x in range(self._grid.shape[0]):
-            for y in range(self._grid.shape[1]):
-                if self[x, y] is color:
-                    vertices.append((x, y))
-        return vertices
+        return [(x, y) for x, y in np.argwhere(self._grid == color.value).tolist()]
 
     def score(self, color: Color) -> int:
         """Returns the score of a player i.e. the number of vertices belonging to the player + the number of his prisoners
@@ -443,4 +1210,40 @@ class Board:
 
         Returns:
              The score of the given player"""
-        return self._prisoners.get(color, 0) + np.count_nonzero(self._grid == color)
+        return self._prisoners.get(color, 0) + int(np.count_nonzero(self._grid == color.value))
+
+
+def stack_features(boards: Iterable[Board],
+                   out: Optional[np.ndarray] = None,
+                   planes: Iterable[str] = feature_planes,
+                   colors: Optional[Iterable[Color]] = None
+                   ) -> np.ndarray:
+    """Writes the input planes of many boards of the same shape in a single buffer, as :func:`Board.features`
+
+    Args:
+        boards: The boards
+        out: A `(boards, planes, height, width)` array where to write the planes, a new float32 array by default
+        planes: The names of the planes, in order
+        colors: The color of the player of each board, the current player of each board by default
+
+    Raises:
+        ValueError: The boards have different shapes, or see :func:`Board.features`
+
+    Returns:
+        The buffer holding the planes"""
+    boards = list(boards)
+    planes = list(planes)
+    colors = [None] * len(boards) if colors is None else list(colors)
+    if len(colors) != len(boards):
+        raise ValueError(f"{len(colors)} colors are given for {len(boards)} boards")
+    shapes = {board.shape for board in boards}
+    if len(shapes) > 1:
+        raise ValueError(f"The boards have different shapes {sorted(shapes)}")
+    shape = (len(boards), len(planes), *(shapes.pop() if shapes else (0, 0)))
+    if out is None:
+        out = np.zeros(shape, dtype=np.float32)
+    elif out.shape != shape:
+        raise ValueError(f"The buffer has shape {out.shape} instead of {shape}")
+    for buffer, board, color in zip(out, boards, colors):
+        board.features(buffer, planes, color)
+    return out
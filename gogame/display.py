@@ -0,0 +1,26 @@
+from __future__ import annotations
+from typing import (
+    TYPE_CHECKING
+)
+
+try:
+    from matplotlib import pyplot as plt
+    from matplotlib.colors import ListedColormap
+except ImportError as e:
+    raise ImportError("matplotlib is required to display boards, install it with `pip install gogame[display]`") from e
+
+from .board import min_color, max_color
+
+if TYPE_CHECKING:
+    from .board import Board
+
+cmap = ListedColormap(["red", (0.59, 0.44, 0.2), "black", "white", "green", "blue", "yellow", "purple", "pink", "orange"])
+
+
+def display(board: Board) -> None:
+    """Displays a board with matplotlib
+
+    Args:
+        board: The board to display"""
+    plt.imshow(board.matrix(), cmap=cmap, vmin=min_color, vmax=max_color)
+    plt.pause(0.1)
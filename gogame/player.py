@@ -85,6 +85,11 @@ class Player(ABC):
         """Returns the list of all vertices available for playing"""
         return self._board.playable_moves(self._color)
 
+    @in_game
+    def legal_mask(self) -> np.ndarray:
+        """Returns a boolean matrix of the board, True on every vertice available for playing"""
+        return self._board.legal_mask(self._color)
+
     @in_game
     def my_vertices(self) -> list[tuple[int, int]]:
         """Returns a list of all vertices owned by the player"""
@@ -118,5 +123,6 @@ class Player(ABC):
     @abstractmethod
     def play(self) -> Optional[tuple[int, int]]:
         """This method has to be overridden by subclasses
-        It's called when the player has to play and must return a 2-tuple (x, y) representing a move, or None for skipping the turn"""
+        It's called when the player has to play and must return a 2-tuple (x, y) representing a move, or None for skipping the turn.
+        With :func:`Board.run_game_async`, it can be a coroutine"""
         pass
@@ -0,0 +1,243 @@
+from __future__ import annotations
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Optional,
+    Union,
+)
+
+import numpy as np
+
+from .bitboard import BitBoard
+from .board import Board
+from .enum import Color
+from .player import Player, in_game
+
+
+class _Node:
+    """The statistics of a position in the search tree, shared by every path leading to the position"""
+    __slots__ = ('mover', 'visits', 'wins', 'untried', 'children')
+
+    def __init__(self, mover: Color, moves: list[Optional[tuple[int, int]]]):
+        self.mover: Color = mover
+        self.visits: int = 0
+        self.wins: float = 0
+        self.untried: list[Optional[tuple[int, int]]] = moves
+        self.children: list[tuple[Optional[tuple[int, int]], tuple[int, int, bool, bool]]] = []
+
+
+def _pack_position(board: Union[Board, BitBoard]) -> tuple:
+    """Returns the position, history, prisoners and players colors of a board as bytes and ints, cheap to send to a process"""
+    return (board.matrix().astype(np.int8).tobytes(),
+            board.shape,
+            np.fromiter(board._history, dtype=np.uint64, count=len(board._history)).tobytes(),
+            board._passed,
+            {c.value: n for c, n in board._prisoners.items()},
+            sorted(c.value for c in board._players),
+            board._current_player.color.value)
+
+
+def _search_worker(position: tuple,
+                   playouts: Optional[int],
+                   time_limit: Optional[float],
+                   exploration: float,
+                   seed: int
+                   ) -> list[tuple[Optional[tuple[int, int]], int]]:
+    grid, shape, history, passed, prisoners, colors, current = position
+    board = BitBoard.from_grid(np.frombuffer(grid, dtype=np.int8).reshape(shape))
+    board._history = set(np.frombuffer(history, dtype=np.uint64).tolist())
+    board._passed = passed
+    board._prisoners = {Color(c): n for c, n in prisoners.items()}
+    players = {c: MCTSPlayer(color=Color(c), playouts=playouts, time_limit=time_limit, exploration=exploration, seed=seed)
+               for c in colors}
+    for c in colors:
+        board.join(players[c])
+    board._current_player = players[current]
+    player = players[current]
+    node = player._run(board, None if time_limit is None else time.perf_counter() + time_limit)
+    return [(move, player._table[key].visits) for move, key in node.children]
+
+
+class MCTSPlayer(Player):
+    """A player searching its moves with Monte Carlo tree search (UCT) and random playouts
+
+    Statistics are stored in a transposition table keyed by the hash of the position and the color to play,
+    so that the same position reached by different move orders shares its results
+    and the tree of the previous move is reused on the next one.
+    The search runs on a :class:`BitBoard` copy of the board and playouts use :func:`Board.playout`.
+    """
+    def __init__(self,
+                 name: Optional[str] = None,
+                 color: Optional[Color] = None,
+                 *,
+                 playouts: Optional[int] = 1000,
+                 time_limit: Optional[float] = None,
+                 exploration: float = 1.4,
+                 seed: Optional[Union[int, np.random.Generator]] = None,
+                 workers: Optional[int] = None
+                 ):
+        """
+        Args:
+            name: The name of the player (only used to identify it)
+            color: The color the player will player, if set to None, it's automatically set by the board
+            playouts: The maximum number of playouts per move
+            time_limit: The maximum number of seconds spent per move
+            exploration: The exploration constant of UCT
+            seed: A numpy random generator or a seed for the search
+            workers: The number of processes sharing each search, 1 by default.
+                With more, each process searches the same position with its share of the playouts
+                and the visit counts of the moves are summed, the tree is then not reused from a move to the next
+
+        Raises:
+            ValueError: Neither a playout nor a time budget is given"""
+        super().__init__(name, color)
+        if playouts is None and time_limit is None:
+            raise ValueError("MCTSPlayer needs a playout or a time budget")
+        self.playouts: Optional[int] = playouts
+        self.time_limit: Optional[float] = time_limit
+        self.exploration: float = exploration
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._table: dict[tuple[int, int, bool, bool], _Node] = {}
+        self.workers: int = workers or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
+
+    def close(self) -> None:
+        """Shuts down the worker processes, they are started again by the next search"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _initiate(self, board: Board):
+        super()._initiate(board)
+        self._table = {}
+
+    def _snapshot(self) -> BitBoard:
+        board = self._board
+        snapshot = board.clone() if isinstance(board, BitBoard) else BitBoard.from_board(board)
+        snapshot.show = False
+        snapshot._players = dict(board._players)
+        snapshot._current_player = board._current_player
+        return snapshot
+
+    @staticmethod
+    def _key(board: BitBoard, over: bool = False) -> tuple[int, int, bool, bool]:
+        """The position, the color to play, whether the last move was a skip and whether the game is over
+
+        Once the game is over, the color is the one of the player who made the last skip, so that the same final
+        position reached through different orders of skips keeps a node per player"""
+        return board.hash, board._current_player.color.value, board._passed, over
+
+    def _node(self, board: BitBoard, over: bool = False) -> tuple[tuple[int, int, bool, bool], _Node]:
+        key = self._key(board, over)
+        if key not in self._table:
+            colors = sorted(board._players, key=lambda c: c.value)
+            color = board._current_player.color
+            moves: list[Optional[tuple[int, int]]] = [] if over else board.playable_moves(color) + [None]
+            self._rng.shuffle(moves)
+            self._table[key] = _Node(color if over else colors[colors.index(color) - 1], moves)
+        return key, self._table[key]
+
+    def _select(self, node: _Node) -> tuple[Optional[tuple[int, int]], tuple[int, int, bool, bool]]:
+        log_visits = math.log(max(node.visits, 1))
+        best, best_value = node.children[0], -math.inf
+        for child in node.children:
+            stats = self._table[child[1]]
+            if not stats.visits:
+                return child
+            value = stats.wins / stats.visits + self.exploration * math.sqrt(log_visits / stats.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _prune(self, root: tuple[int, int, bool, bool]) -> None:
+        """Keeps only the positions which can still be reached from the root"""
+        kept = {root: self._table[root]}
+        to_visit = [root]
+        while to_visit:
+            for _, key in self._table[to_visit.pop()].children:
+                if key not in kept and key in self._table:
+                    kept[key] = self._table[key]
+                    to_visit.append(key)
+        self._table = kept
+
+    def _search(self, root: BitBoard) -> None:
+        board = root.clone()
+        _, node = self._node(board)
+        path = [node]
+        over = False
+        while not over:
+            if node.untried:
+                move, expand = node.untried.pop(), True
+            elif node.children:
+                move, expand = self._select(node)[0], False
+            else:
+                break
+            color = board._current_player.color
+            if move is None:
+                over = board.skip(color=color)
+            elif not board.is_playable(*move, color):
+                break
+            else:
+                board.play(*move, color=color)
+            key, node = self._node(board, over)
+            if expand:
+                path[-1].children.append((move, key))
+            path.append(node)
+            if expand:
+                break
+        if over:
+            scores = {c: board.score(c) for c in board._players}
+        else:
+            scores = board.playout(rng=self._rng)
+        winner = max(reversed(list(board._players)), key=lambda c: scores[c])
+        for node in path:
+            node.visits += 1
+            if node.mover is winner:
+                node.wins += 1
+
+    def _run(self, root: BitBoard, deadline: Optional[float]) -> _Node:
+        """Searches from a position until the budgets are exhausted and returns the root node"""
+        key, node = self._node(root)
+        self._prune(key)
+        count = 0
+        while (self.playouts is None or count < self.playouts) and (deadline is None or time.perf_counter() < deadline):
+            self._search(root)
+            count += 1
+        return node
+
+    def _run_parallel(self, deadline: Optional[float]) -> list[tuple[Optional[tuple[int, int]], int]]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        position = _pack_position(self._board)
+        playouts = None if self.playouts is None else -(-self.playouts // self.workers)
+        time_limit = None if deadline is None else max(deadline - time.perf_counter(), 0)
+        seeds = self._rng.integers(2**63, size=self.workers).tolist()
+        futures = [self._executor.submit(_search_worker, position, playouts, time_limit, self.exploration, seed)
+                   for seed in seeds]
+        visits: dict[Optional[tuple[int, int]], int] = {}
+        for future in futures:
+            for move, count in future.result():
+                visits[move] = visits.get(move, 0) + count
+        return list(visits.items())
+
+    @in_game
+    def play(self) -> Optional[tuple[int, int]]:
+        """Searches the best move within the playout and time budgets
+
+        Returns:
+            The move with the most visits, or None to skip"""
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        if self.workers > 1:
+            visits = self._run_parallel(deadline)
+        else:
+            node = self._run(self._snapshot(), deadline)
+            visits = [(move, self._table[key].visits) for move, key in node.children]
+        if not visits:
+            return None
+        return max(visits, key=lambda item: item[1])[0]
@@ -0,0 +1,213 @@
+from __future__ import annotations
+import random
+from typing import (
+    Optional,
+)
+
+import numpy as np
+
+from .enum import Color
+
+
+def _playout(grid: np.ndarray,
+             neighbours: tuple[tuple[int, ...], ...],
+             diagonals: tuple[tuple[int, ...], ...],
+             colors: list[Color],
+             turn: int,
+             passed: bool,
+             prisoners: dict[Color, int],
+             max_moves: int,
+             generator: random.Random
+             ) -> dict[Color, int]:
+    """Plays random moves from a position until two skips in a row and returns the score of each color
+
+    The rules are light: suicide is forbidden and a single stone cannot be retaken right away (simple ko),
+    but previous positions are not checked. A player never fills his own eyes, i.e. vertices whose neighbours are all
+    his stones and whose diagonals hold at most one opponent stone, none on the edges, and skips when no other move is left.
+    Groups are kept incrementally as lists of stones and sets of liberties indexed by the flat vertices."""
+    board = grid.ravel().tolist()
+    empty_value = Color.Empty.value
+    group = [-1] * len(board)
+    stones: dict[int, list[int]] = {}
+    liberties: dict[int, set[int]] = {}
+    for v, value in enumerate(board):
+        if value > 0 and group[v] < 0:
+            group[v] = v
+            members = [v]
+            free = set()
+            for s in members:
+                for k in neighbours[s]:
+                    if board[k] == value and group[k] < 0:
+                        group[k] = v
+                        members.append(k)
+                    elif board[k] == empty_value:
+                        free.add(k)
+            stones[v] = members
+            liberties[v] = free
+    empties = [v for v, value in enumerate(board) if value == empty_value]
+    position = [0] * len(board)
+    for i, v in enumerate(empties):
+        position[v] = i
+    captures = [0] * len(colors)
+    ko = -1
+
+    for _ in range(max_moves):
+        color = colors[turn].value
+        count = len(empties)
+        while count:
+            i = int(generator.random() * count)
+            v = empties[i]
+            eye = True
+            legal = v != ko
+            if legal:
+                legal = False
+                for k in neighbours[v]:
+                    value = board[k]
+                    if value == empty_value:
+                        legal = True
+                        eye = False
+                    elif value == color:
+                        if len(liberties[group[k]]) > 1:
+                            legal = True
+                    else:
+                        eye = False
+                        if len(liberties[group[k]]) == 1:
+                            legal = True
+            if eye:
+                opponents = 0
+                for k in diagonals[v]:
+                    if board[k] != color and board[k] != empty_value:
+                        opponents += 1
+                eye = opponents == 0 or (opponents == 1 and len(diagonals[v]) == 4)
+            if legal and not eye:
+                break
+            count -= 1
+            empties[i], empties[count] = empties[count], v
+            position[empties[i]] = i
+            position[v] = count
+        else:
+            if passed:
+                break
+            passed = True
+            turn = (turn + 1) % len(colors)
+            continue
+
+        last = empties.pop()
+        if last != v:
+            empties[position[v]] = last
+            position[last] = position[v]
+        board[v] = color
+        group[v] = v
+        stones[v] = [v]
+        liberties[v] = set()
+        captured = []
+        for k in neighbours[v]:
+            value = board[k]
+            if value == empty_value:
+                liberties[group[v]].add(k)
+                continue
+            g = group[k]
+            if value != color:
+                liberties[g].discard(v)
+                if not liberties[g] and g not in captured:
+                    captured.append(g)
+            elif g != group[v]:
+                liberties[g].discard(v)
+                mine = group[v]
+                if len(stones[g]) < len(stones[mine]):
+                    g, mine = mine, g
+                for s in stones[mine]:
+                    group[s] = g
+                stones[g].extend(stones.pop(mine))
+                liberties[g] |= liberties.pop(mine)
+        mine = group[v]
+        liberties[mine].discard(v)
+
+        ko = -1
+        for g in captured:
+            removed = stones.pop(g)
+            del liberties[g]
+            captures[turn] += len(removed)
+            for s in removed:
+                board[s] = empty_value
+                group[s] = -1
+                position[s] = len(empties)
+                empties.append(s)
+            for s in removed:
+                for k in neighbours[s]:
+                    if group[k] >= 0:
+                        liberties[group[k]].add(s)
+            if len(captured) == 1 and len(removed) == 1 and len(stones[mine]) == 1 and len(liberties[mine]) == 1:
+                ko = removed[0]
+        passed = False
+        turn = (turn + 1) % len(colors)
+
+    scores = {c: prisoners.get(c, 0) + captures[i] for i, c in enumerate(colors)}
+    for value in board:
+        if value > 0:
+            c = Color(value)
+            if c in scores:
+                scores[c] += 1
+    return scores
+
+
+def _dead_group(board: list[int], neighbours: tuple[tuple[int, ...], ...], vertice: int) -> Optional[list[int]]:
+    """Returns the stones of the group of a vertice if it has no liberty, None as soon as a liberty is found"""
+    empty = Color.Empty.value
+    value = board[vertice]
+    group = [vertice]
+    seen = {vertice}
+    for s in group:
+        for k in neighbours[s]:
+            if board[k] == empty:
+                return None
+            if board[k] == value and k not in seen:
+                seen.add(k)
+                group.append(k)
+    return group
+
+
+def _replay(grid: np.ndarray,
+            neighbours: tuple[tuple[int, ...], ...],
+            keys: list[list[int]],
+            position: int,
+            moves: list[tuple[int, int]],
+            planes: Optional[np.ndarray] = None
+            ) -> tuple[list[int], dict[int, int], list[int]]:
+    """Plays moves given as (color value, flat vertice) pairs, a negative vertice for a skip, without checking the rules
+
+    The board after each move is written in the rows of `planes` when given, an array of shape `(len(moves), size)`.
+
+    Returns:
+        The final board as a flat list, the number of captured stones per color value and the hash after each move"""
+    board = grid.ravel().tolist()
+    empty = Color.Empty.value
+    captures: dict[int, int] = {}
+    hashes = []
+    for i, (color, v) in enumerate(moves):
+        if v < 0:
+            if planes is not None:
+                planes[i] = board
+            continue
+        if board[v] != empty:
+            raise ValueError(f"The vertice {divmod(v, grid.shape[1])} is not empty")
+        board[v] = color
+        position ^= keys[color][v]
+        for k in neighbours[v]:
+            if board[k] > 0 and board[k] != color:
+                dead = _dead_group(board, neighbours, k)
+                if dead is not None:
+                    captured = board[k]
+                    captures[color] = captures.get(color, 0) + len(dead)
+                    for s in dead:
+                        position ^= keys[captured][s]
+                        board[s] = empty
+        dead = _dead_group(board, neighbours, v)
+        if dead is not None:
+            for s in dead:
+                position ^= keys[color][s]
+                board[s] = empty
+        hashes.append(position)
+        if planes is not None:
+            planes[i] = board
+    return board, captures, hashes
@@ -0,0 +1,246 @@
+from __future__ import annotations
+import io
+import os
+import re
+from typing import (
+    IO,
+    Generator,
+    Optional,
+    Union,
+)
+
+import numpy as np
+
+from .board import Board
+from .enum import Color
+
+_token = re.compile(r'\s*(?:([();])|([A-Za-z]+)\s*((?:\[(?:\\.|[^\\\]])*\]\s*)+))', re.S)
+_value = re.compile(r'\[((?:\\.|[^\\\]])*)\]', re.S)
+_escape = re.compile(r'\\(\r\n|\n\r|\n|\r|.)', re.S)
+_letters = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_colors = {'B': Color.Black, 'W': Color.White}
+
+
+def _unescape(value: str) -> str:
+    return _escape.sub(lambda m: '' if m.group(1) in ('\n', '\r', '\r\n', '\n\r') else m.group(1), value)
+
+
+def _escape_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace(']', '\\]')
+
+
+def _point(value: str) -> tuple[int, int]:
+    return _letters.index(value[1]), _letters.index(value[0])
+
+
+def _points(values: list[str]) -> list[tuple[int, int]]:
+    """Expands a list of SGF points, where `aa:cc` is a rectangle, into (x, y) vertices"""
+    points = []
+    for value in values:
+        if ':' in value:
+            (x1, y1), (x2, y2) = (_point(v) for v in value.split(':'))
+            points.extend((x, y) for x in range(min(x1, x2), max(x1, x2) + 1) for y in range(min(y1, y2), max(y1, y2) + 1))
+        else:
+            points.append(_point(value))
+    return points
+
+
+class SGFGame:
+    """Represents the main line of a game read from an SGF file"""
+    def __init__(self, properties: dict[str, list[str]], moves: list[tuple[Color, Optional[tuple[int, int]]]]):
+        """
+        Args:
+            properties: The properties of the root node, each with the list of its values
+            moves: The moves of the main line as (color, vertice) pairs, the vertice is None for a skip"""
+        self.properties: dict[str, list[str]] = properties
+        self.moves: list[tuple[Color, Optional[tuple[int, int]]]] = moves
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} size={self.size} moves={len(self.moves)}>"
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """The (height, width) of the board, from the `SZ` property"""
+        value = self.properties.get('SZ', ['19'])[0]
+        if ':' in value:
+            width, height = value.split(':')
+            return int(height), int(width)
+        return int(value), int(value)
+
+    @property
+    def setup(self) -> dict[Color, list[tuple[int, int]]]:
+        """The stones placed before the first move, from the `AB` and `AW` properties"""
+        return {c: _points(self.properties.get(f'A{k}', [])) for k, c in _colors.items()}
+
+    def replay(self, validate: bool = False) -> Board:
+        """Plays the game on a new board
+
+        Args:
+            validate: Whether to play each move with :func:`Board.play`, which checks the rules and records the moves,
+                instead of the faster :func:`Board.replay`
+
+        Raises:
+            ValueError: A move is invalid, only checked with `validate`
+
+        Returns:
+            The board at the end of the game"""
+        grid = np.zeros(self.size, dtype=np.int8)
+        for color, points in self.setup.items():
+            for point in points:
+                grid[point] = color.value
+        board = Board.from_grid(grid) if grid.any() else Board(size=self.size)
+        if not validate:
+            board.replay(self.moves)
+            return board
+        for color, move in self.moves:
+            if move is None:
+                board.skip(color=color)
+            else:
+                board.play(*move, color=color)
+        return board
+
+
+def _parse_move(value: str, size: tuple[int, int]) -> Optional[tuple[int, int]]:
+    if not value or (value == 'tt' and max(size) <= 19):
+        return None
+    return _point(value)
+
+
+def _games(chunks: Generator[str, None, None]) -> Generator[SGFGame, None, None]:
+    buffer = ''
+    position = 0
+    depth = 0
+    skipping = 0
+    closed: set[int] = set()
+    properties: dict[str, list[str]] = {}
+    moves: list[tuple[Color, Optional[tuple[int, int]]]] = []
+    nodes = 0
+    size = (19, 19)
+    end = False
+    while True:
+        if not depth:
+            start = buffer.find('(', position)
+            position = len(buffer) if start < 0 else start
+        match = _token.match(buffer, position)
+        if match is None or (not end and (match.end() == len(buffer) or buffer[match.end()] == '[')):
+            if end:
+                if depth:
+                    raise ValueError("The SGF data is malformed or ends in the middle of a game")
+                return
+            chunk = next(chunks, None)
+            if chunk is None:
+                end = True
+            else:
+                buffer = buffer[position:] + chunk
+                position = 0
+            continue
+        position = match.end()
+        symbol, name, values = match.groups()
+        if symbol == '(':
+            depth += 1
+            if not skipping and depth in closed:
+                skipping = depth
+        elif symbol == ')':
+            if skipping == depth:
+                skipping = 0
+            elif not skipping:
+                closed.add(depth)
+            depth -= 1
+            if depth == 0:
+                yield SGFGame(properties, moves)
+                closed, properties, moves, nodes, size = set(), {}, [], 0, (19, 19)
+            elif depth < 0:
+                raise ValueError("Unbalanced parentheses in the SGF data")
+        elif skipping or not depth:
+            continue
+        elif symbol == ';':
+            nodes += 1
+        elif name in _colors:
+            moves.append((_colors[name], _parse_move(_value.match(values).group(1).strip(), size)))
+        elif nodes == 1:
+            properties[name] = [_unescape(v) for v in _value.findall(values)]
+            if name == 'SZ':
+                size = SGFGame(properties, []).size
+
+
+def parse_sgf(text: str) -> Generator[SGFGame, None, None]:
+    """Parses SGF data lazily, one game of the collection at a time
+
+    Note:
+        Only the main line of each game is kept, i.e. the first variation of every node.
+
+    Args:
+        text: The SGF data
+
+    Raises:
+        ValueError: The data is malformed
+
+    Yields:
+        The games of the collection"""
+    return _games(iter([text]))
+
+
+def read_sgf(source: Union[str, os.PathLike, IO[str]], chunk_size: int = 1 << 16) -> Generator[SGFGame, None, None]:
+    """Reads an SGF file lazily, one game of the collection at a time, as :func:`parse_sgf`
+
+    Args:
+        source: The path of the file or a text file object
+        chunk_size: The number of characters read at once
+
+    Raises:
+        ValueError: The data is malformed
+
+    Yields:
+        The games of the collection"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding='utf-8', errors='replace') as file:
+            yield from read_sgf(file, chunk_size)
+        return
+    yield from _games(iter(lambda: source.read(chunk_size) or None, None))
+
+
+def write_sgf(board: Board, file: Optional[IO[str]] = None) -> str:
+    """Exports the moves played on a board, for example at the end of :func:`Board.run_game`
+
+    Note:
+        The position before the first move is written as setup stones, walls cannot be represented in SGF.
+
+    Args:
+        board: The board to export, its moves are the ones which can be undone with :func:`Board.undo`
+        file: A text file object where to write the data
+
+    Raises:
+        ValueError: The board has more than two player colors, or is larger than 52x52
+
+    Returns:
+        The SGF data"""
+    height, width = board.shape
+    if max(height, width) > len(_letters):
+        raise ValueError(f"SGF boards are at most {len(_letters)} wide")
+    grid = board._initial_grid()
+    if np.any(grid > Color.White.value) or any(move.color.value > Color.White.value for move in board._moves):
+        raise ValueError("SGF only supports Black and White")
+
+    def point(x: int, y: int) -> str:
+        return _letters[y] + _letters[x]
+
+    out = io.StringIO()
+    out.write(f"(;GM[1]FF[4]CA[UTF-8]SZ[{width if width == height else f'{width}:{height}'}]")
+    for key, color in _colors.items():
+        player = board._players.get(color)
+        if player is not None and player.name:
+            out.write(f"P{key}[{_escape_value(player.name)}]")
+    black, white = board.score(Color.Black), board.score(Color.White)
+    out.write(f"RE[{'B' if black > white else 'W'}+{abs(black - white)}]" if black != white else "RE[0]")
+    for key, color in _colors.items():
+        stones = np.argwhere(grid == color.value).tolist()
+        if stones:
+            out.write(f"A{key}" + ''.join(f"[{point(x, y)}]" for x, y in stones))
+    for move in board._moves:
+        key = 'B' if move.color is Color.Black else 'W'
+        out.write(f";{key}[{point(*move.vertice) if move.vertice is not None else ''}]")
+    out.write(")\n")
+    data = out.getvalue()
+    if file is not None:
+        file.write(data)
+    return data
@@ -34,9 +34,11 @@ class Territory:
             ValueError: Failed to create the territory with the given parameters
         """
         self._board: Board = board
-        self._vertices: list[tuple[int, int]]
-        self._freedom: list[tuple[int, int]]
+        self._id: Optional[int] = None
+        self._vertices: set[int]
+        self._freedom: set[int]
         self._color: Color
+        self._hash: int = 0
 
         if vertices is not None and x is None and y is None:
             if not isinstance(vertices, list):
@@ -46,16 +48,21 @@ class Territory:
             self._color = board[vertices[0]]
             if any(board[v] is not self._color for v in vertices):
                 raise ValueError('Vertices are of different colors')
-            self._vertices = vertices
-            self._freedom = self._hypothetical_freedom() if self._color is not Color.Empty else []
-            if not self.is_coherent:
+            width = board._grid.shape[1]
+            self._vertices = {x * width + y for x, y in vertices}
+            self._freedom = self._hypothetical_freedom() if self._color is not Color.Empty else set()
+            if not self.is_coherent():
                 raise ValueError('Vertices are not all nearby')
         elif x is not None and y is not None and vertices is None:
-            self._vertices = self._explore(x, y)
+            self._vertices = self._explore(x * board._grid.shape[1] + y)
             self._color = board[x, y]
-            self._freedom = self._hypothetical_freedom() if self._color is not Color.Empty else []
+            self._freedom = self._hypothetical_freedom() if self._color is not Color.Empty else set()
         else:
             raise TypeError("Please provide either vertices or both x and y")
+        if self._color.is_player():
+            keys = board._keys[self._color.value]
+            for v in self._vertices:
+                self._hash ^= keys[v]
 
     def __repr__(self):
         return f"<{self.__class__.__name__} board={self._board} size={self.size} color={self._color}>"
@@ -67,7 +74,9 @@ class Territory:
 
     @property
     def vertices(self) -> list[tuple[int, int]]:
-        return self._vertices
+        """The vertices of the territory, sorted by row"""
+        width = self._board._grid.shape[1]
+        return [divmod(v, width) for v in sorted(self._vertices)]
 
     def clone(self, board: Optional[Board] = None) -> Territory:
         """Returns a deep copy of the territory
@@ -78,21 +87,47 @@ class Territory:
         Returns:
              The copy of the territory
         """
-        new_territory = Territory(vertices=list(self._vertices), board=board if board else self._board)
-        return new_territory
+        return self._from_state(board=board if board else self._board,
+                                id=self._id,
+                                color=self._color,
+                                vertices=set(self._vertices),
+                                freedom=set(self._freedom),
+                                hash=self._hash)
+
+    @classmethod
+    def _from_state(cls, *,
+                    board: Board,
+                    id: Optional[int],
+                    color: Color,
+                    vertices: set[int],
+                    freedom: set[int],
+                    hash: int
+                    ) -> Territory:
+        territory = cls.__new__(cls)
+        territory._board = board
+        territory._id = id
+        territory._color = color
+        territory._vertices = vertices
+        territory._freedom = freedom
+        territory._hash = hash
+        return territory
+
+    def _is_registered(self) -> bool:
+        return self._id is not None and self._board._territories.get(self._id) is self
 
     def is_coherent(self) -> bool:
-        return set(self._explore(*self._vertices[0])) == set(self._vertices)
+        return self._explore(next(iter(self._vertices))) == self._vertices
 
-    def _explore(self, x: int, y: int) -> list[tuple[int, int]]:
-        to_explore = set(self._board.around(x, y))
-        explored = [(x, y)]
+    def _explore(self, vertice: int) -> set[int]:
+        grid = self._board._grid.ravel()
+        value = grid[vertice]
+        explored = {vertice}
+        to_explore = [vertice]
         while to_explore:
-            for i, j in list(to_explore):
-                if self._board[i, j] is self._board[x, y]:
-                    explored.append((i, j))
-                    to_explore.update({k for k in self._board.around(i, j) if k not in explored})
-                to_explore.remove((i, j))
+            for k in self._board._neighbours.lists[to_explore.pop()]:
+                if k not in explored and grid[k] == value:
+                    explored.add(k)
+                    to_explore.append(k)
         return explored
 
     @classmethod
@@ -124,7 +159,7 @@ class Territory:
                 raise TypeError('Expected 2-len tuple for with_vertices')
             vertices.append(with_vertice)
         for x in territories:
-            vertices.extend(x._vertices)
+            vertices.extend(x.vertices)
         new_territory = cls(vertices=list(set(vertices)), board=territories[0]._board)
         return new_territory
 
@@ -136,7 +171,7 @@ class Territory:
 
         Returns:
              Indicate if the territory is connected or not"""
-        return any(territory.is_touching(x, y) for x, y in self._vertices)
+        return any(territory.is_touching(x, y) for x, y in self.vertices)
 
     def is_touching(self, x: int, y: int) -> bool:
         """Checks if a vertice is touching the territory
@@ -147,10 +182,11 @@ class Territory:
 
         Returns:
             Indicate if the vertice is touching the territory"""
-        for i, j in self._board.around(x, y):
-            if (i, j) in self._vertices:
-                return True
-        return False
+        if self._is_registered():
+            labels = self._board._labels
+            return any(labels[i, j] == self._id for i, j in self._board.around(x, y))
+        width = self._board._grid.shape[1]
+        return any(i * width + j in self._vertices for i, j in self._board.around(x, y))
 
     def includes(self, x: int, y: int, color: Optional[Color] = None) -> bool:
         """Checks if a vertice is included in the territory
@@ -162,29 +198,37 @@ class Territory:
 
         Returns:
              Indicates if the vertice is included or not"""
-        return (color is None or color is self._color) and (x, y) in self._vertices
-
-    def _update(self, x: int, y: int, color: Color) -> None:
-        if self.is_touching(x, y):
-            if color is self._color:
-                if (x, y) not in self._vertices:
-                    self._vertices.append((x, y))
-                    if self._color is not Color.Empty:
-                        if (x, y) in self._freedom:
-                            self._freedom.remove((x, y))
-                        self._freedom.extend([(i, j) for i, j in self._board.around(x, y) if self._board[i, j] is Color.Empty])
-            else:
-                if (x, y) in self._vertices:
-                    self._vertices.remove((x, y))
-                    if self._color is not Color.Empty:
-                        if self._board[x, y] is Color.Empty:
-                            self._freedom.append((x, y))
-                        for i, j in self._board.around(x, y):
-                            if (i, j) in self._freedom and not any((k, l) in self._vertices for k, l in self._board.around(i, j)):
-                                self._freedom.remove((i, j))
-                else:
-                    if (x, y) in self._freedom:
-                        self._freedom.remove((x, y))
+        if color is not None and color is not self._color:
+            return False
+        if self._is_registered():
+            return bool(self._board._labels[x, y] == self._id)
+        return x * self._board._grid.shape[1] + y in self._vertices
+
+    def _add(self, vertice: int) -> set[int]:
+        grid = self._board._grid.ravel()
+        self._vertices.add(vertice)
+        self._hash ^= self._board._keys[self._color.value][vertice]
+        self._freedom.discard(vertice)
+        added = {k for k in self._board._neighbours.lists[vertice] if grid[k] == Color.Empty.value} - self._freedom
+        self._freedom |= added
+        return added
+
+    def _remove(self, vertice: int, freedom: set[int]) -> None:
+        self._vertices.discard(vertice)
+        self._hash ^= self._board._keys[self._color.value][vertice]
+        self._freedom -= freedom
+        self._freedom.add(vertice)
+
+    def _absorb(self, territory: Territory) -> set[int]:
+        self._vertices |= territory._vertices
+        self._hash ^= territory._hash
+        added = territory._freedom - self._freedom
+        self._freedom |= added
+        return added
+
+    def _split(self, territory: Territory) -> None:
+        self._vertices -= territory._vertices
+        self._hash ^= territory._hash
 
     @property
     def board(self) -> Board:
@@ -200,29 +244,15 @@ class Territory:
         """Calculate the freedom of the territory, i.e. the vertices where it can expend
 
         Returns:
-            The list of available vertices to expend the territory"""
-        return self._freedom
-
-    def _hypothetical_freedom(self,
-                              x: Optional[int] = None,
-                              y: Optional[int] = None,
-                              color: Optional[Color] = None
-                              ) -> list[tuple[int, int]]:
-        if any(k is None for k in [x, y, color]) and not all(k is None for k in [x, y, color]):
-            raise TypeError('x, y and color have to be all specified')
-        free_vertices = []
-        if x is not None and y is not None and color is not None:
-            hypothetical_board = np.copy(self._board._grid)
-            hypothetical_board[x, y] = color
-            if color == self._color and self.is_touching(x, y):
-                hypothetical_vertices = self._vertices + [(x, y)]
-            else:
-                hypothetical_vertices = self._vertices
-        else:
-            hypothetical_board = self._board._grid
-            hypothetical_vertices = self._vertices
-        for x, y in hypothetical_vertices:
-            for i, j in self._board.around(x, y):
-                if hypothetical_board[i, j] is Color.Empty and (i, j) not in free_vertices:
-                    free_vertices.append((i, j))
+            The list of available vertices to expend the territory, sorted by row"""
+        width = self._board._grid.shape[1]
+        return [divmod(v, width) for v in sorted(self._freedom)]
+
+    def _hypothetical_freedom(self) -> set[int]:
+        grid = self._board._grid.ravel()
+        free_vertices = set()
+        for v in self._vertices:
+            for k in self._board._neighbours.lists[v]:
+                if grid[k] == Color.Empty.value:
+                    free_vertices.add(k)
         return free_vertices
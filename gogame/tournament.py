@@ -0,0 +1,156 @@
+from __future__ import annotations
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from typing import (
+    Callable,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .board import Board, profiled_phases
+from .player import Player
+
+
+class TournamentResult:
+    """Represents the results of a tournament, stored as one row per game"""
+    def __init__(self,
+                 names: list[str],
+                 winners: np.ndarray,
+                 scores: np.ndarray,
+                 turns: np.ndarray,
+                 stats: Optional[dict[str, dict[str, float]]] = None):
+        """
+        Args:
+            names: The names of the competitors
+            winners: The index of the winner of each game
+            scores: The score of each competitor in each game, of shape (games, competitors)
+            turns: The number of turns of each game
+            stats: The profiling counters of all the games summed, as in :func:`Board.stats`"""
+        self._names: list[str] = names
+        self._winners: np.ndarray = winners
+        self._scores: np.ndarray = scores
+        self._turns: np.ndarray = turns
+        self._stats: Optional[dict[str, dict[str, float]]] = stats
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} games={len(self._winners)} wins={dict(zip(self._names, self.wins().tolist()))}>"
+
+    @property
+    def names(self) -> list[str]:
+        """The names of the competitors, in the order of the factories"""
+        return self._names
+
+    @property
+    def winners(self) -> np.ndarray:
+        """The index of the winner of each game"""
+        return self._winners
+
+    @property
+    def scores(self) -> np.ndarray:
+        """The score of each competitor in each game, of shape (games, competitors)"""
+        return self._scores
+
+    @property
+    def turns(self) -> np.ndarray:
+        """The number of moves and skips of each game"""
+        return self._turns
+
+    @property
+    def stats(self) -> Optional[dict[str, dict[str, float]]]:
+        """The profiling counters of all the games summed, as in :func:`Board.stats`, None unless profiling was enabled"""
+        return self._stats
+
+    def wins(self) -> np.ndarray:
+        """Returns the number of wins of each competitor"""
+        return np.bincount(self._winners, minlength=len(self._names))
+
+    def win_rate(self) -> np.ndarray:
+        """Returns the proportion of games won by each competitor"""
+        return self.wins() / max(len(self._winners), 1)
+
+
+def _run_match(factories: Sequence[Callable[[], Player]],
+               order: Sequence[int],
+               size: Union[int, tuple[int, int]],
+               circular: bool,
+               max_turn: Optional[int],
+               max_duration: Optional[int],
+               seed: int,
+               profile: bool = False
+               ) -> tuple[int, list[int], int, Optional[dict[str, dict[str, float]]]]:
+    random.seed(seed)
+    np.random.seed(seed)
+    board = Board.circular(size) if circular else Board(size=size)
+    board.profiling = profile
+    players = [factories[i]() for i in order]
+    for player in players:
+        board.join(player)
+    winner = board.run_game(max_turn=max_turn, max_duration=max_duration)
+    scores = [0] * len(factories)
+    for i, player in zip(order, players):
+        scores[i] = board.score(player.color)
+    return order[players.index(winner)], scores, len(board._moves), board.stats() if profile else None
+
+
+def run_tournament(factories: Sequence[Callable[[], Player]],
+                   games: int,
+                   *,
+                   size: Union[int, tuple[int, int]] = 19,
+                   circular: bool = False,
+                   max_turn: Optional[int] = 1000,
+                   max_duration: Optional[int] = None,
+                   workers: Optional[int] = None,
+                   seed: Optional[int] = None,
+                   profile: bool = False
+                   ) -> TournamentResult:
+    """Runs many games between players in parallel processes with :func:`Board.run_game`
+
+    Note:
+        The order of the players is rotated from one game to the next so that each competitor plays every color.
+        Factories, typically :class:`Player` subclasses, have to be picklable.
+
+    Args:
+        factories: A list of callables, each returning a new player
+        games: The number of games to play
+        size: The size of the boards, as in :class:`Board`
+        circular: Whether to play on boards made with :func:`Board.circular`
+        max_turn: The maximum number of moves of each game
+        max_duration: The maximum number of seconds of each game
+        workers: The number of processes, default to the number of CPUs. With 1 the games are played in the current process
+        seed: The seed from which the seed of each game is drawn, so that a tournament can be replayed
+        profile: Whether to enable :attr:`Board.profiling` in every game, the counters are summed in the result
+
+    Raises:
+        ValueError: Less than two factories are given
+
+    Returns:
+        The results of the tournament"""
+    if len(factories) < 2:
+        raise ValueError("A tournament needs at least two players")
+    seeds = np.random.SeedSequence(seed).generate_state(games).tolist()
+    orders = [[(i + k) % len(factories) for k in range(len(factories))] for i in range(games)]
+    arguments = [[factories] * games, orders, [size] * games, [circular] * games,
+                 [max_turn] * games, [max_duration] * games, seeds, [profile] * games]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = list(map(_run_match, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_run_match, *arguments, chunksize=max(1, games // (4 * workers))))
+    names = [getattr(f, "__name__", repr(f)) for f in factories]
+    winners, scores, turns, game_stats = zip(*results) if results else ([], [], [], [])
+    stats = None
+    if profile:
+        stats = {phase: {'calls': 0, 'time': 0.} for phase in profiled_phases}
+        for counters in game_stats:
+            for phase, counter in counters.items():
+                stats[phase]['calls'] += counter['calls']
+                stats[phase]['time'] += counter['time']
+    return TournamentResult(names,
+                            np.array(winners, dtype=np.int64),
+                            np.array(scores, dtype=np.int64).reshape(games, len(factories)),
+                            np.array(turns, dtype=np.int64),
+                            stats)
@@ -26,5 +26,8 @@ setup(
     url='https://github.com/BlackRaven0405/gogame',
     keywords='go gogame',
     python_requires='>=3.8',
-    install_requires=requirements
+    install_requires=requirements,
+    extras_require={
+        'display': ['matplotlib>=3.4']
+    }
 )
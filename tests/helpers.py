@@ -0,0 +1,15 @@
+import random
+
+from gogame import Player
+
+
+class RandomPlayer(Player):
+    def play(self):
+        moves = self.playable_moves()
+        return random.choice(moves) if moves else None
+
+
+class FirstPlayer(Player):
+    def play(self):
+        moves = self.playable_moves()
+        return moves[0] if moves else None
@@ -0,0 +1,81 @@
+from gogame import *
+from gogame.archive import ArchiveWriter, GameArchive
+from gogame.sgf import parse_sgf
+import pytest
+import random
+import numpy as np
+from helpers import RandomPlayer
+
+
+def random_board(seed, board):
+    random.seed(seed)
+    board.join(RandomPlayer(color=Color.Black))
+    board.join(RandomPlayer(color=Color.White))
+    board.run_game(max_turn=120)
+    return board
+
+
+@pytest.mark.parametrize("planes", [False, True])
+def test_archive_round_trip(tmp_path, planes):
+    boards = [random_board(seed, Board.circular(9) if seed % 2 else Board(size=9)) for seed in range(4)]
+    with ArchiveWriter(tmp_path / 'games', size=9, planes=planes) as writer:
+        for i, board in enumerate(boards):
+            assert writer.add(board) == i
+    archive = GameArchive(tmp_path / 'games')
+    assert len(archive) == 4
+    assert archive.total_moves == sum(len(b._moves) for b in boards)
+    for i, board in enumerate(boards):
+        assert archive.record(i) == [(m.color, m.vertice) for m in board._moves]
+        assert np.array_equal(archive.position(i), board.matrix())
+        rebuilt = archive.board(i)
+        assert rebuilt.hash == board.hash
+        assert rebuilt._history == board._history
+        assert rebuilt._prisoners.get(Color.Black, 0) == board.prisoners(Color.Black)
+        move = archive.length(i) // 2
+        for _ in range(len(board._moves) - move):
+            board.undo()
+        assert np.array_equal(archive.position(i, move), board.matrix())
+        assert archive.board(i, move).hash == board.hash
+        assert np.array_equal(archive.position(i, 0), archive.board(i, 0).matrix())
+
+
+def test_archive_append(tmp_path):
+    game = next(parse_sgf("(;SZ[9]AB[aa];W[bb];B[];W[cc])"))
+    start = np.zeros((9, 9), dtype=np.int8)
+    start[0, 0] = Color.Black.value
+    with ArchiveWriter(tmp_path, size=9) as writer:
+        writer.add_moves(game.moves, start)
+    with ArchiveWriter(tmp_path, size=9) as writer:
+        assert len(writer) == 1
+        assert writer.add_moves([]) == 1
+    archive = GameArchive(tmp_path)
+    assert len(archive) == 2
+    vertices, colors = archive.moves(0)
+    assert vertices.tolist() == [10, 65535, 20]
+    assert colors.tolist() == [2, 1, 2]
+    assert archive.record(-2) == game.moves
+    assert np.array_equal(archive.position(0), game.replay().matrix())
+    assert archive.length(1) == 0
+    assert not archive.position(1).any()
+    board = archive.board(1)
+    board.play(0, 0, color=Color.Black)
+
+
+def test_archive_errors(tmp_path):
+    with ArchiveWriter(tmp_path, size=9) as writer:
+        with pytest.raises(ValueError):
+            writer.add_moves([], np.zeros((5, 5)))
+        with pytest.raises(IndexError):
+            writer.add_moves([(Color.Black, (9, 0))])
+        writer.add_moves([(Color.Black, (0, 0))])
+    with pytest.raises(ValueError):
+        ArchiveWriter(tmp_path, size=13)
+    with pytest.raises(ValueError):
+        ArchiveWriter(tmp_path, size=9, planes=True)
+    with pytest.raises(ValueError):
+        GameArchive(tmp_path / 'missing')
+    archive = GameArchive(tmp_path)
+    with pytest.raises(IndexError):
+        archive.record(1)
+    with pytest.raises(IndexError):
+        archive.position(0, 2)
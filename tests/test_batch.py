@@ -0,0 +1,75 @@
+from gogame import *
+import pytest
+import numpy as np
+
+
+def test_batch_creation():
+    batch = BoardBatch(3, size=(5, 7))
+    assert len(batch) == 3
+    assert batch.matrix().shape == (3, 5, 7)
+    assert batch.legal_mask(Color.Black).all()
+    assert np.all(batch.score(Color.White) == 0)
+    with pytest.raises(ValueError):
+        batch.legal_mask(Color.Wall)
+
+
+def test_batch_capture_and_ko():
+    board = Board.from_grid(np.array([[0, 1, 2, 0],
+                                      [1, 2, 0, 2],
+                                      [0, 1, 2, 0]]))
+    batch = BoardBatch.from_board(board, 2)
+    batch.play([[1, 2], [0, 0]], color=Color.Black)
+    assert batch[0][1, 1] is Color.Empty
+    assert batch[1][1, 1] is Color.White
+    assert list(batch.prisoners(Color.Black)) == [1, 0]
+    mask = batch.legal_mask(Color.White)
+    assert not mask[0, 1, 1]
+    assert not mask[1, 0, 0]
+    with pytest.raises(ValueError):
+        batch.play([[1, 1], [-1, -1]], color=Color.White)
+    assert list(batch.score(Color.Black)) == [5, 4]
+
+
+def test_batch_item_is_independent():
+    batch = BoardBatch(2, size=5)
+    board = batch[0]
+    board.play(2, 2, color=Color.Black)
+    assert not batch.matrix().any()
+    assert batch.legal_mask(Color.White)[0, 2, 2]
+
+
+def test_batch_skip():
+    batch = BoardBatch(2, size=5)
+    batch.play([[0, 0], [-1, -1]], color=Color.Black)
+    over = batch.play([[-1, -1], [-1, -1]], color=Color.White)
+    assert list(over) == [False, False]
+    over = batch.play([[-1, -1], [2, 2]], color=Color.Black)
+    assert list(over) == [True, False]
+    assert not batch.legal_mask(Color.White)[0].any()
+
+
+@pytest.mark.parametrize("board", [Board(size=7), Board.circular(9)])
+def test_batch_matches_board(board):
+    rng = np.random.default_rng(0)
+    count = 6
+    boards = [board.clone() for _ in range(count)]
+    batch = BoardBatch.from_board(board, count)
+    colors = [Color.Black, Color.White]
+    over = set()
+    for turn in range(120):
+        color = colors[turn % 2]
+        mask = batch.legal_mask(color)
+        moves = np.full((count, 2), -1)
+        for i, b in enumerate(boards):
+            if i in over:
+                continue
+            assert np.array_equal(mask[i], b.legal_mask(color))
+            legal = np.argwhere(mask[i])
+            if len(legal) and rng.random() > 0.1:
+                moves[i] = legal[rng.integers(len(legal))]
+                b.play(*moves[i], color=color)
+            elif b.skip(color=color):
+                over.add(i)
+        assert set(np.nonzero(batch.play(moves, color=color))[0]) == over
+        assert np.array_equal(batch.matrix(), np.array([b.matrix() for b in boards]))
+        assert list(batch.score(color)) == [b.score(color) for b in boards]
@@ -0,0 +1,62 @@
+from gogame import *
+import pytest
+import numpy as np
+from helpers import FirstPlayer
+
+
+def test_bitboard_creation():
+    b = BitBoard.circular((9, 7))
+    assert b.shape == (9, 7)
+    assert np.array_equal(b.matrix(), Board.circular((9, 7)).matrix())
+    assert b[0, 0] is Color.Wall
+    assert b[4, 3] is Color.Empty
+    assert b.hash == 0
+    with pytest.raises(ValueError):
+        b.is_playable(4, 3, Color.Wall)
+    with pytest.raises(IndexError):
+        b.is_playable(9, 0, Color.Black)
+
+
+def test_bitboard_capture_and_ko():
+    b = BitBoard.from_grid(np.array([[0, 1, 2, 0],
+                                     [1, 2, 0, 2],
+                                     [0, 1, 2, 0]]))
+    b.play(1, 2, color=Color.Black)
+    assert b[1, 1] is Color.Empty
+    assert b.prisoners(Color.Black) == 1
+    assert b.score(Color.Black) == 5
+    assert not b.is_playable(1, 1, Color.White)
+    clone = b.clone()
+    clone.play(0, 3, color=Color.Black)
+    assert b[0, 2] is Color.White
+    assert clone[0, 2] is Color.Empty
+
+
+@pytest.mark.parametrize("board", [Board(size=7), Board.circular(9), Board(size=(5, 8))])
+def test_bitboard_matches_board(board):
+    rng = np.random.default_rng(0)
+    bitboard = BitBoard.from_board(board)
+    colors = [Color.Black, Color.White, Color.Green]
+    for turn in range(150):
+        color = colors[turn % 3]
+        moves = board.playable_moves(color)
+        assert bitboard.playable_moves(color) == moves
+        assert np.array_equal(bitboard.legal_mask(color), board.legal_mask(color))
+        if moves and rng.random() > 0.05:
+            move = moves[rng.integers(len(moves))]
+            board.play(*move, color=color)
+            bitboard.play(*move, color=color)
+        else:
+            assert bitboard.skip(color=color) == board.skip(color=color)
+        assert np.array_equal(bitboard.matrix(), board.matrix())
+        assert bitboard.hash == board.hash
+        assert [bitboard.score(c) for c in colors] == [board.score(c) for c in colors]
+
+
+def test_bitboard_run_game():
+    b = BitBoard(size=5)
+    b.join(FirstPlayer())
+    b.join(FirstPlayer())
+    winner = b.run_game(max_turn=200)
+    assert winner in b._players.values()
+    assert b.score(Color.Black) + b.score(Color.White) > 0
@@ -1,6 +1,8 @@
 from gogame import *
 import pytest
 import numpy as np
+import subprocess
+import sys
 
 
 class MockPlayer(Player):
@@ -11,8 +13,8 @@ class MockPlayer(Player):
 def test_square_board_creation():
     b = Board(size=5)
     assert b._grid.shape == (5, 5)
-    assert b._last_grid.shape == (5, 5)
-    assert np.all(b._grid == Color.Empty)
+    assert b._history == {b.hash}
+    assert np.all(b._grid == Color.Empty.value)
     assert len(b._territories) == 1
     assert b._territories[0].color == Color.Empty
     assert len(b._territories[0]._vertices) == 25
@@ -21,8 +23,8 @@ def test_square_board_creation():
 def test_non_square_board_creation():
     b = Board(size=(3, 7))
     assert b._grid.shape == (3, 7)
-    assert b._last_grid.shape == (3, 7)
-    assert np.all(b._grid == Color.Empty)
+    assert b._history == {b.hash}
+    assert np.all(b._grid == Color.Empty.value)
     assert len(b._territories) == 1
     assert b._territories[0].color == Color.Empty
     assert len(b._territories[0]._vertices) == 21
@@ -49,14 +51,31 @@ def test_non_square_board_creation():
 def test_circular_board_creation(shape, grid):
     b = Board.circular(size=shape)
     assert b._grid.shape == shape
-    assert b._last_grid.shape == shape
-    reference_grid = np.vectorize(Color)(grid)
-    assert np.all(b._grid == reference_grid)
+    assert b._history == {b.hash}
+    assert np.all(b._grid == grid)
     assert len(b._territories) == 1
     assert b._territories[0].color == Color.Empty
     assert len(b._territories[0]._vertices) == np.count_nonzero(grid == 0)
 
 
+def test_mask_board_creation():
+    mask = np.array([
+        [True, True, False],
+        [False, True, True],
+        [True, False, True]])
+    b = Board.from_mask(mask)
+    assert np.all((b._grid == Color.Wall.value) == ~mask)
+    assert np.all((b._labels == 0) == mask)
+    assert b._territories[0].vertices == [(0, 0), (0, 1), (1, 1), (1, 2), (2, 0), (2, 2)]
+    b.play(0, 0, color=Color.Black)
+    b.play(2, 2, color=Color.White)
+    assert b._territories[1].freedom() == [(0, 1)]
+    assert b.playable_moves(Color.Black) == [(0, 1), (1, 1), (1, 2)]
+    assert not Board.from_mask(np.zeros((2, 2), dtype=bool)).territories()
+    with pytest.raises(ValueError):
+        Board.from_mask(np.ones(4, dtype=bool))
+
+
 def test_get_item():
     b = Board.from_grid(np.vectorize(Color)(np.array([
         [0, 1, 1, 0],
@@ -140,12 +159,50 @@ def test_clear_players():
 def test_from_grid(grid, territory_count):
     b = Board.from_grid(np.vectorize(Color)(grid))
     assert b._grid.shape == grid.shape
-    assert b._last_grid.shape == grid.shape
-    reference_grid = np.vectorize(Color)(grid)
-    assert np.all(b._grid == reference_grid)
+    assert b._history == {b.hash}
+    assert np.all(b._grid == grid)
     assert len(b._territories) == territory_count
 
 
+def test_from_grid_values():
+    grid = np.array([[0, 1, -1],
+                     [2, 0, 0]])
+    b = Board.from_grid(grid)
+    assert b._grid.dtype == np.int8
+    assert b[0, 1] is Color.Black
+    assert b[0, 2] is Color.Wall
+    assert b.vertices(Color.White) == [(1, 0)]
+    assert np.array_equal(b.matrix(), grid)
+    with pytest.raises(ValueError):
+        Board.from_grid(np.array([[0, 42]]))
+
+
+def test_from_grid_copies():
+    grid = np.zeros((3, 3), dtype=np.int8)
+    b = Board.from_grid(grid)
+    b.play(1, 1, color=Color.Black)
+    assert not grid.any()
+    copy = Board.from_grid(b.matrix())
+    copy.play(0, 0, color=Color.White)
+    assert b[0, 0] is Color.Empty
+    assert copy[1, 1] is Color.Black
+
+
+def test_from_grid_groups():
+    grid = np.random.default_rng(0).choice([-1, 0, 0, 1, 2, 3], size=(19, 17))
+    b = Board.from_grid(grid)
+    assert sum(t.size for t in b.territories()) == grid.size
+    assert b.hash == b._compute_hash()
+    for t in b.territories():
+        x, y = t.vertices[0]
+        reference = Territory(x=x, y=y, board=b)
+        assert set(t.vertices) == set(reference.vertices)
+        if t.color.is_player():
+            assert set(t.freedom()) == set(reference.freedom())
+        assert t._hash == reference._hash
+        assert all(b.get_territory(*v) is t for v in t.vertices)
+
+
 @pytest.mark.parametrize(("grid", "checks"), [
     (np.array([[1, 2, 0, 2, 1],
                [1, 2, 2, 2, 1],
@@ -157,7 +214,9 @@ def test_from_grid(grid, territory_count):
                [1, 1, 1, 1, 1]]), [(0, 0, Color.Black, False), (0, 2, Color.Black, True), (0, 2, Color.White, False)]),
     (np.array([[-1, -1, 0, 0, 1, 0],
                [-1, 0, 0, 1, 0, 1],
-               [0, 0, 0, 0, 1, 0]]), [(0, 0, Color.Black, False), (1, 1, Color.Black, True), (1, 1, Color.White, True), (1, 4, Color.Black, True), (1, 4, Color.White, False)])
+               [0, 0, 0, 0, 1, 0]]), [(0, 0, Color.Black, False), (1, 1, Color.Black, True), (1, 1, Color.White, True), (1, 4, Color.Black, True), (1, 4, Color.White, False)]),
+    (np.array([[0, 2, 0],
+               [-1, 2, 0]]), [(0, 0, Color.Black, False), (0, 0, Color.White, True)])
 ])
 def test_is_playable(grid, checks):
     b = Board.from_grid(np.vectorize(Color)(grid))
@@ -186,6 +245,31 @@ def test_playable_moves(grid, black_values, white_values):
     assert set(b.playable_moves(Color.White)) == set(white_values)
 
 
+@pytest.mark.parametrize("grid", [
+    np.array([[1, 2, 0, 2, 1],
+              [1, 2, 2, 2, 1],
+              [1, 2, 0, 0, 1]]),
+    np.array([[0, 1, 0],
+              [1, 0, 1],
+              [0, 1, 0]]),
+    np.array([[-1, -1, 0, 0, 1, 0],
+              [-1, 0, 0, 1, 0, 1],
+              [0, 0, 0, 0, 1, 0]]),
+    np.array([[0, 2, 0],
+              [-1, 2, 0]]),
+])
+def test_legal_mask(grid):
+    b = Board.from_grid(grid)
+    for color in [Color.Black, Color.White, Color.Green]:
+        mask = b.legal_mask(color)
+        assert mask.shape == grid.shape
+        for x in range(grid.shape[0]):
+            for y in range(grid.shape[1]):
+                assert mask[x, y] == b.is_playable(x, y, color)
+    with pytest.raises(ValueError):
+        b.legal_mask(Color.Empty)
+
+
 def test_run_game():
     ref_color = Color.Black
     count = 0
@@ -213,18 +297,111 @@ def test_run_game():
 def test_play():
     b = Board(size=5)
     b.play(0, 0, color=Color.Black)
-    assert b._grid[0, 0] == Color.Black
+    assert b[0, 0] == Color.Black
     b.play(0, 1, color=Color.White)
-    assert b._grid[0, 1] == Color.White
+    assert b[0, 1] == Color.White
     b.play(0, 2, color=Color.Black)
     with pytest.raises(ValueError):
         b.play(0, 1, color=Color.White)
     b.play(3, 3, color=Color.White)
     b.play(1, 1, color=Color.Black)
-    assert b._grid[0, 1] == Color.Empty
+    assert b[0, 1] == Color.Empty
     with pytest.raises(ValueError):
         b.play(0, 1, color=Color.White)
-    assert b._grid[0, 1] == Color.Empty
+    assert b[0, 1] == Color.Empty
+
+
+def test_superko():
+    b = Board.from_grid(np.array([[0, 1, 2, 0],
+                                  [1, 2, 0, 2],
+                                  [0, 1, 2, 0]]))
+    empty_hash = Board(size=(3, 4)).hash
+    assert b.hash != empty_hash
+    b.play(1, 2, color=Color.Black)
+    assert b[1, 1] is Color.Empty
+    assert not b.is_playable(1, 1, Color.White)
+    assert not b.legal_mask(Color.White)[1, 1]
+    with pytest.raises(ValueError):
+        b.play(1, 1, color=Color.White)
+    b.play(0, 3, color=Color.White)
+    b.play(0, 0, color=Color.Black)
+    assert b.is_playable(1, 1, Color.White)
+    assert b.legal_mask(Color.White)[1, 1]
+    b.play(1, 1, color=Color.White)
+    assert b[1, 2] is Color.Empty
+    assert b.hash == b._compute_hash()
+    assert len(b._history) == 5
+
+
+def test_undo():
+    b = Board(size=5)
+    with pytest.raises(ValueError):
+        b.undo()
+    b.play(0, 1, color=Color.Black)
+    b.play(0, 0, color=Color.White)
+    b.play(1, 0, color=Color.Black)
+    assert b[0, 0] is Color.Empty
+    assert b.prisoners(Color.Black) == 1
+    b.undo()
+    assert b[0, 0] is Color.White
+    assert b[1, 0] is Color.Empty
+    assert b.prisoners(Color.Black) == 0
+    assert b.get_territory(0, 0).freedom() == [(1, 0)]
+    assert not b.skip(color=Color.Black)
+    b.undo()
+    assert not b._passed
+    b.play(1, 0, color=Color.Black)
+    assert b[0, 0] is Color.Empty
+
+
+def test_clone():
+    b = Board(size=5)
+    b.play(0, 1, color=Color.Black)
+    b.play(0, 0, color=Color.White)
+    b.play(1, 0, color=Color.Black)
+    c = b.clone()
+    assert c.prisoners(Color.Black) == 1
+    assert c.hash == b.hash
+    with pytest.raises(ValueError):
+        c.undo()
+    c.play(2, 2, color=Color.White)
+    assert b[2, 2] is Color.Empty
+    assert b.get_territory(2, 2).color is Color.Empty
+    assert c.get_territory(2, 2).color is Color.White
+
+
+def test_matrix():
+    b = Board(size=5)
+    m = b.matrix()
+    assert m is b.matrix()
+    assert np.shares_memory(m, b._grid)
+    with pytest.raises(ValueError):
+        m[0, 0] = Color.Black.value
+    b.play(0, 0, color=Color.Black)
+    assert m[0, 0] == Color.Empty.value
+    assert b.matrix() is not m
+    assert b.matrix()[0, 0] == Color.Black.value
+    b.skip(color=Color.White)
+    b.undo()
+    b.undo()
+    assert b.matrix()[0, 0] == Color.Empty.value
+
+
+def test_playout():
+    b = Board(size=9)
+    b.play(4, 4, color=Color.Black)
+    position = b.matrix().copy()
+    scores = b.playout(rng=3)
+    assert scores == b.playout(rng=np.random.default_rng(3))
+    assert set(scores) == {Color.Black, Color.White}
+    assert sum(scores.values()) >= 40
+    assert np.array_equal(b.matrix(), position)
+    assert b.playout(max_moves=0) == {Color.Black: 1, Color.White: 0}
+    grid = np.ones((5, 5), dtype=int)
+    grid[0, 0] = grid[4, 4] = 0
+    assert Board.from_grid(grid).playout(rng=0) == {Color.Black: 23, Color.White: 0}
+    with pytest.raises(ValueError):
+        b.playout(policy="heavy")
 
 
 def test_skip():
@@ -233,6 +410,9 @@ def test_skip():
     reference = np.copy(b._grid)
     assert not b.skip(color=Color.White)
     assert np.all(reference == b._grid)
+    move = b._moves[-1]
+    assert all(isinstance(field, (tuple, frozenset))
+               for field in (move.merged, move.freedom, move.opponents, move.captured, move.freed))
     assert b.skip(color=Color.Black)
 
 
@@ -242,7 +422,7 @@ def test_winner():
     p2 = MockPlayer(color=Color.White)
     b._players = {Color.Black: p1, Color.White: p2}
     assert b.winner() is p2
-    b._grid[0, 0] = Color.Black
+    b._grid[0, 0] = Color.Black.value
     assert b.winner() is p1
     b._prisoners[Color.White] = 1
     assert b.winner() is p2
@@ -250,6 +430,47 @@ def test_winner():
     assert b.winner() is p1
 
 
+def test_headless_import():
+    code = "import sys, gogame; gogame.Board(size=5).play(0, 0, color=gogame.Color.Black); assert 'matplotlib' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_neighbour_table():
+    b = Board.circular((9, 7))
+    width = b.shape[1]
+    table = b.neighbour_table
+    assert table is Board.circular((9, 7)).neighbour_table
+    assert table is BitBoard.circular((9, 7)).neighbour_table
+    assert table is not Board(size=(9, 7)).neighbour_table
+    for v, neighbours in enumerate(table.lists):
+        x, y = divmod(v, width)
+        expected = [i * width + j for i, j in b.around(x, y) if (b[i, j] is Color.Wall) == (b[x, y] is Color.Wall)]
+        assert list(neighbours) == expected
+        assert table.indices[table.indptr[v]:table.indptr[v + 1]].tolist() == expected
+        assert table.table[v].tolist() == expected + [-1] * (4 - len(expected))
+    with pytest.raises(ValueError):
+        table.table[0, 0] = 0
+
+
+def test_neighbour_table_cache_is_bounded():
+    from gogame.board import _cached_neighbour_table, _neighbour_cache_size
+    circular = Board.circular(9).neighbour_table
+    rng = np.random.default_rng(0)
+    for _ in range(_neighbour_cache_size + 5):
+        Board.from_mask(rng.random((12, 12)) < 0.8)
+        assert Board.circular(9).neighbour_table is circular
+    assert _cached_neighbour_table.cache_info().currsize <= _neighbour_cache_size
+
+
+def test_neighbour_table_diagonals():
+    board = Board.from_grid([[0, 0, 0], [0, 0, -1], [0, 0, 0]])
+    diagonals = board.neighbour_table.diagonals
+    assert diagonals[0] == (4,)
+    assert diagonals[4] == (0, 2, 6, 8)
+    assert diagonals[2] == (4,)
+    assert diagonals[1] == (3,)
+
+
 def test_around():
     grid = np.array([[1, 2, 0, 2, 1],
                      [1, 2, 2, 2, 1],
@@ -259,3 +480,113 @@ def test_around():
     assert set(b.around(0, 0)) == {(0, 1), (1, 0)}
     assert set(b.around(1, 1)) == {(0, 1), (1, 0), (2, 1), (1, 2)}
     assert set(b.around(3, 2, include_center=True)) == {(3, 1), (3, 2), (3, 3), (2, 2)}
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.uint8])
+def test_features(dtype):
+    b = Board.from_grid(np.array([[0, 1, 2, 0],
+                                  [1, 2, 0, 2],
+                                  [0, 1, 2, 0]]))
+    b.play(1, 2, color=Color.Black)
+    b.play(0, 3, color=Color.White)
+    out = np.full((len(feature_planes), 3, 4), 7, dtype=dtype)
+    assert b.features(out, color=Color.White) is out
+    planes = dict(zip(feature_planes, out))
+    grid = b.matrix()
+    assert np.array_equal(planes['own'], grid == Color.White.value)
+    assert np.array_equal(planes['opponent'], grid == Color.Black.value)
+    assert np.array_equal(planes['empty'], grid == Color.Empty.value)
+    assert planes['liberties_1'].sum() == 5 and planes['liberties_1'][1, 2] == 1
+    assert planes['liberties_2'].sum() == 2 and planes['liberties_2'][0, 1] == planes['liberties_2'][2, 1] == 1
+    assert planes['liberties_3'].sum() == 1 and planes['liberties_3'][1, 0] == 1
+    assert planes['age'][0, 3] == 1 and planes['age'][1, 2] == 2 and planes['age'][0, 2] == 255
+    assert planes['age'][1, 1] == 0
+    assert planes['ko'].sum() == 0
+    assert np.array_equal(planes['legal'], b.legal_mask(Color.White))
+
+    b.undo()
+    ko, legal = b.features(planes=['ko', 'legal'], color=Color.White)
+    assert ko.dtype == np.float32
+    assert ko[1, 1] == 1 and ko.sum() == 1
+    assert not legal[1, 1]
+
+
+def test_stack_features():
+    boards = [Board(size=5), Board.circular(5)]
+    boards[0].play(2, 2, color=Color.Black)
+    out = stack_features(boards, planes=['own', 'opponent', 'legal'], colors=[Color.White, Color.Black])
+    assert out.shape == (2, 3, 5, 5)
+    assert np.array_equal(out[0], boards[0].features(planes=['own', 'opponent', 'legal'], color=Color.White))
+    assert np.array_equal(out[1, 2], boards[1].legal_mask(Color.Black))
+    with pytest.raises(ValueError):
+        stack_features([Board(size=5), Board(size=9)], colors=[Color.Black] * 2)
+    with pytest.raises(ValueError):
+        boards[0].features()
+    with pytest.raises(ValueError):
+        boards[0].features(planes=['unknown'], color=Color.Black)
+    with pytest.raises(ValueError):
+        boards[0].features(np.zeros((1, 5, 5)), color=Color.Black)
+
+
+def test_profiling():
+    b = Board(size=5)
+    assert not b.profiling
+    with pytest.raises(ValueError):
+        b.stats()
+    b.play(0, 0, color=Color.Black)
+    b.profiling = True
+    assert set(b.stats()) == set(profiled_phases)
+    b.play(0, 1, color=Color.White)
+    b.play(1, 0, color=Color.White)
+    with pytest.raises(ValueError):
+        b.play(0, 1, color=Color.Black)
+    b.playable_moves(Color.Black)
+    stats = b.stats()
+    assert stats['validation']['calls'] == 3
+    assert stats['is_playable']['calls'] == 2
+    assert stats['captures']['calls'] == 2
+    assert stats['playable_moves']['calls'] == 1
+    assert stats['display']['calls'] == 0
+    assert all(s['time'] >= 0 for s in stats.values())
+    assert b.clone().stats()['validation']['calls'] == 0
+    b.reset_stats()
+    assert all(s == {'calls': 0, 'time': 0} for s in b.stats().values())
+    b.profiling = False
+    assert not b.clone().profiling
+
+
+def test_event_hooks():
+    b = Board(size=(3, 4))
+    events = []
+    b.on_move(lambda vertice, color: events.append(('move', vertice, color)))
+    b.on_pass(lambda color: events.append(('pass', color)))
+    b.on_game_end(lambda winner: events.append(('end', winner)))
+
+    @b.on_capture
+    def captured(vertice, color, stones):
+        events.append(('capture', vertice, color, stones))
+
+    b.play(0, 0, color=Color.White)
+    b.play(0, 1, color=Color.Black)
+    b.skip(color=Color.White)
+    b.play(1, 0, color=Color.Black)
+    assert events == [('move', 0, Color.White), ('move', 1, Color.Black), ('pass', Color.White),
+                      ('move', 4, Color.Black), ('capture', 4, Color.Black, [0])]
+    assert b.clone()._hooks == {}
+    b.unsubscribe(captured)
+    with pytest.raises(ValueError):
+        b.unsubscribe(captured)
+    events.clear()
+    b.undo()
+    b.play(1, 0, color=Color.Black)
+    b.skip(color=Color.White)
+    assert b.skip(color=Color.Black)
+    assert events == [('move', 4, Color.Black), ('pass', Color.White), ('end', None)]
+
+    b = Board(size=5)
+    b.join(MockPlayer(color=Color.Black))
+    b.join(MockPlayer(color=Color.White))
+    ends = []
+    b.on_game_end(ends.append)
+    winner = b.run_game(max_turn=3)
+    assert ends == [winner.color]
@@ -1,4 +1,6 @@
 from gogame import *
+import asyncio
+import numpy as np
 import random
 
 
@@ -25,6 +27,58 @@ def test_random_game():
         p = Color.White if p is Color.Black else Color.Black
 
 
+def test_territory_consistency():
+    b = Board(size=9)
+    p = Color.Black
+    for _ in range(120):
+        playable = b.playable_moves(p)
+        if not playable:
+            break
+        x, y = random.choice(playable)
+        b.play(x, y, color=p)
+        p = Color.White if p is Color.Black else Color.Black
+        for t in b.territories():
+            assert all(b.get_territory(*v) is t for v in t.vertices)
+            if t.color.is_player():
+                assert all(b[v] is t.color for v in t.vertices)
+                assert t._freedom == t._hypothetical_freedom()
+        assert b.hash == b._compute_hash()
+        assert set(b.playable_moves(p)) == {v for v in b.vertices(Color.Empty) if b.is_playable(*v, p)}
+    assert sum(t.size for t in b.territories()) == b._grid.size
+
+
+def test_undo_random_game():
+
+    def state(board):
+        territories = {(t.color, frozenset(t.vertices), frozenset(t.freedom()), t._hash) for t in board.territories()}
+        return board.matrix(), board.hash, dict(board._prisoners), territories, board.legal_mask(Color.Black)
+
+    b = Board(size=7)
+    p = Color.Black
+    states = []
+    for _ in range(150):
+        states.append(state(b))
+        playable = b.playable_moves(p)
+        if playable and random.random() > 0.05:
+            b.play(*random.choice(playable), color=p)
+        elif b.skip(color=p):
+            states.pop()
+            break
+        p = Color.White if p is Color.Black else Color.Black
+    while states:
+        b.undo()
+        grid, position, prisoners, territories, mask = states.pop()
+        assert np.array_equal(b.matrix(), grid)
+        assert b.hash == position
+        assert {c: n for c, n in b._prisoners.items() if n} == {c: n for c, n in prisoners.items() if n}
+        assert state(b)[3] == territories
+        assert np.array_equal(b.legal_mask(Color.Black), mask)
+        for t in b.territories():
+            assert all(b.get_territory(*v) is t for v in t.vertices)
+    assert b._history == {b.hash}
+    assert b._next_id == 1
+
+
 def test_random_player():
 
     class SimplePlayer(Player):
@@ -77,3 +131,66 @@ def test_shaped_board():
         x, y = random.choice(playable)
         b.play(x, y, color=p)
         p = Color.White if p is Color.Black else Color.Black
+
+
+class AsyncPlayer(Player):
+    def __init__(self, delay=0.):
+        super().__init__()
+        self.delay = delay
+        self.cancelled = 0
+
+    async def play(self):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        moves = self.playable_moves()
+        return moves[0] if moves else None
+
+
+def test_run_game_async():
+
+    class SimplePlayer(Player):
+        def play(self):
+            moves = self.playable_moves()
+            return moves[-1] if moves else None
+
+    async def games():
+        boards = [Board(size=5) for _ in range(4)]
+        players = []
+        for b in boards:
+            players.append((AsyncPlayer(0.001), SimplePlayer()))
+            for p in players[-1]:
+                b.join(p)
+        return boards, players, await asyncio.gather(*(b.run_game_async(max_turn=30) for b in boards))
+
+    boards, players, winners = asyncio.run(games())
+    for b, pair, winner in zip(boards, players, winners):
+        assert winner in pair
+        assert 0 < len(b._moves) <= 30
+
+
+def test_run_game_async_timeouts():
+    slow, fast = AsyncPlayer(10), AsyncPlayer()
+    b = Board(size=5)
+    b.join(slow)
+    b.join(fast)
+    passes = []
+    b.on_pass(passes.append)
+    asyncio.run(b.run_game_async(max_turn=4, move_timeout=0.01))
+    assert slow.cancelled == 2
+    assert passes == [slow.color, slow.color]
+    assert len(b._moves) == 4
+
+    b = Board(size=5)
+    slow = AsyncPlayer(10)
+    b.join(AsyncPlayer())
+    b.join(slow)
+    ends = []
+    b.on_game_end(ends.append)
+    winner = asyncio.run(asyncio.wait_for(b.run_game_async(max_turn=None, max_duration=0.05), 1))
+    assert slow.cancelled == 1
+    assert len(b._moves) == 1
+    assert ends == [winner.color]
+
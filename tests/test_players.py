@@ -0,0 +1,86 @@
+from gogame import *
+from gogame.players import MCTSPlayer
+import pytest
+import random
+import time
+import numpy as np
+from helpers import RandomPlayer
+
+
+def test_mcts_captures():
+    b = Board.from_grid(np.array([[0, 1, 2, 1, 0],
+                                  [0, 1, 2, 1, 0],
+                                  [0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0]]))
+    player = MCTSPlayer(playouts=300, seed=0)
+    b.join(player)
+    b.join(RandomPlayer())
+    move = player.play()
+    assert move == (2, 2)
+    b.play(*move, color=player.color)
+    node = player._table[player._key(player._snapshot())]
+    assert node.visits > 0
+
+
+def test_mcts_root_parallel():
+    b = Board.from_grid(np.array([[0, 1, 2, 1, 0],
+                                  [0, 1, 2, 1, 0],
+                                  [0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0],
+                                  [0, 0, 0, 0, 0]]))
+    player = MCTSPlayer(playouts=300, seed=0, workers=2)
+    b.join(player)
+    b.join(RandomPlayer())
+    try:
+        assert player.play() == (2, 2)
+        b.play(2, 2, color=player.color)
+        b.skip(color=Color.White)
+        move = player.play()
+        assert move is None or b.is_playable(*move, player.color)
+    finally:
+        player.close()
+    assert player._executor is None
+
+
+def test_mcts_terminal_nodes():
+    player = MCTSPlayer(playouts=1, seed=0)
+    terminals = []
+    for moves in [[(0, 0), (4, 4), None, None], [None, (4, 4), (0, 0), None, None]]:
+        b = BitBoard(size=5)
+        b.join(MCTSPlayer(color=Color.Black))
+        b.join(MCTSPlayer(color=Color.White))
+        for move in moves:
+            color = b._current_player.color
+            over = b.skip(color=color) if move is None else b.play(*move, color=color)
+        assert over
+        terminals.append((b.hash, *player._node(b, over)))
+    (first_hash, first_key, first_node), (second_hash, second_key, second_node) = terminals
+    assert first_hash == second_hash
+    assert first_key != second_key
+    assert first_node.mover is Color.White
+    assert second_node.mover is Color.Black
+
+
+def test_mcts_beats_random():
+    random.seed(0)
+    for seed in range(2):
+        b = Board(size=5)
+        player = MCTSPlayer(playouts=100, seed=seed)
+        players = [player, RandomPlayer()]
+        for p in players[::1 if seed else -1]:
+            b.join(p)
+        assert b.run_game(max_turn=60) is player
+
+
+def test_mcts_budget():
+    with pytest.raises(ValueError):
+        MCTSPlayer(playouts=None)
+    b = BitBoard(size=9)
+    player = MCTSPlayer(playouts=None, time_limit=0.2, seed=0)
+    b.join(player)
+    b.join(RandomPlayer())
+    start = time.perf_counter()
+    move = player.play()
+    assert time.perf_counter() - start < 1
+    assert move is None or b.is_playable(*move, player.color)
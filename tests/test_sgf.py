@@ -0,0 +1,83 @@
+from gogame import *
+from gogame.sgf import parse_sgf, read_sgf, write_sgf
+import io
+import pytest
+import random
+import numpy as np
+from helpers import RandomPlayer
+
+
+SGF = """Some text before the games
+(;GM[1]FF[4]SZ[9]PB[Al\\]ice]AB[aa][bb:cc]C[a comment
+with ( parenthesis];B[ee];W[ef](;B[ff];W[]C[main line])(;B[gg];W[hh]))
+(;SZ[5:7];B[aa];W[tt])"""
+
+
+@pytest.mark.parametrize("games", [
+    lambda: parse_sgf(SGF),
+    lambda: read_sgf(io.StringIO(SGF), chunk_size=3),
+])
+def test_parse_sgf(games):
+    first, second = games()
+    assert first.size == (9, 9)
+    assert first.properties['PB'] == ['Al]ice']
+    assert first.properties['C'] == ['a comment\nwith ( parenthesis']
+    assert first.setup[Color.Black] == [(0, 0), (1, 1), (1, 2), (2, 1), (2, 2)]
+    assert first.moves == [(Color.Black, (4, 4)), (Color.White, (5, 4)), (Color.Black, (5, 5)), (Color.White, None)]
+    assert second.size == (7, 5)
+    assert second.moves == [(Color.Black, (0, 0)), (Color.White, None)]
+
+
+def test_parse_sgf_errors():
+    with pytest.raises(ValueError):
+        list(parse_sgf("(;SZ[9];B[aa]"))
+    assert list(parse_sgf("no game here")) == []
+
+
+def test_sgf_round_trip(tmp_path):
+    random.seed(2)
+    grid = np.zeros((9, 9), dtype=int)
+    grid[4, 4] = Color.Black.value
+    b = Board.from_grid(grid)
+    b.join(RandomPlayer())
+    b.join(RandomPlayer())
+    b.run_game(max_turn=150)
+    path = tmp_path / "game.sgf"
+    with open(path, "w") as file:
+        data = write_sgf(b, file)
+    assert len(b._moves) > 100
+    game, = read_sgf(path)
+    assert len(game.moves) == len(b._moves)
+    assert game.setup[Color.Black] == [(4, 4)]
+    for replayed in (game.replay(), game.replay(validate=True)):
+        assert np.array_equal(replayed.matrix(), b.matrix())
+        assert replayed.hash == b.hash
+        assert replayed._history == b._history
+        assert [replayed.score(c) for c in (Color.Black, Color.White)] == [b.score(c) for c in (Color.Black, Color.White)]
+    assert data.startswith("(;GM[1]FF[4]CA[UTF-8]SZ[9]")
+    assert "PB[" not in data and "PW[" not in data
+
+
+def test_write_sgf_player_names():
+    b = Board(size=9)
+    b.join(RandomPlayer("Al]ice"))
+    b.join(RandomPlayer())
+    data = write_sgf(b)
+    assert "PB[Al\\]ice]" in data
+    assert "PW[" not in data
+    game, = parse_sgf(data)
+    assert game.properties['PB'] == ['Al]ice']
+
+
+def test_replay():
+    b = Board(size=5)
+    b.replay([(Color.Black, (0, 1)), (Color.White, (0, 0)), (Color.Black, (1, 0)), (Color.White, None)])
+    assert b[0, 0] is Color.Empty
+    assert b.prisoners(Color.Black) == 1
+    assert b._passed
+    assert not b.is_playable(0, 0, Color.White)
+    assert b.is_playable(0, 0, Color.Black)
+    with pytest.raises(ValueError):
+        b.replay([(Color.White, (0, 1))])
+    with pytest.raises(IndexError):
+        b.replay([(Color.White, (5, 1))])
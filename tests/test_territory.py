@@ -51,8 +51,8 @@ def test_invalid_merge():
         t2._board = b2
         t1._color = Color(1)
         t2._color = Color(2)
-        t1._vertices = [(1, 1), (1, 2), (1, 3), (2, 3)]
-        t2._vertices = [(3, 3), (3, 2), (3, 1), (2, 1)]
+        t1._vertices = {6, 7, 8, 13}
+        t2._vertices = {18, 17, 16, 11}
         t3 = Territory.merge(t1, t2)
 
 
@@ -67,8 +67,8 @@ def test_valid_merge():
     b2 = Board.from_grid(np.vectorize(Color)(grid))
     t1._board = b2
     t2._board = b2
-    t1._vertices = [(1, 1), (1, 2), (1, 3), (2, 3)]
-    t2._vertices = [(3, 3), (3, 2), (3, 1), (2, 1)]
+    t1._vertices = {6, 7, 8, 13}
+    t2._vertices = {18, 17, 16, 11}
     t1._color = Color(1)
     t2._color = Color(1)
     t3 = Territory.merge(t1, t2)
@@ -0,0 +1,37 @@
+from gogame import *
+from gogame.tournament import run_tournament
+import pytest
+from helpers import RandomPlayer, FirstPlayer
+
+
+def test_tournament_in_process():
+    result = run_tournament([RandomPlayer, FirstPlayer], 4, size=5, max_turn=60, workers=1, seed=3)
+    assert result.names == ["RandomPlayer", "FirstPlayer"]
+    assert result.winners.shape == (4,)
+    assert result.scores.shape == (4, 2)
+    assert result.wins().sum() == 4
+    assert all(0 < t <= 60 for t in result.turns)
+    replay = run_tournament([RandomPlayer, FirstPlayer], 4, size=5, max_turn=60, workers=1, seed=3)
+    assert (replay.scores == result.scores).all()
+
+
+def test_tournament_in_pool():
+    result = run_tournament([RandomPlayer, RandomPlayer, FirstPlayer], 6, size=5, circular=True, max_turn=40, workers=2, seed=1)
+    assert result.scores.shape == (6, 3)
+    assert result.win_rate().sum() == pytest.approx(1)
+    serial = run_tournament([RandomPlayer, RandomPlayer, FirstPlayer], 6, size=5, circular=True, max_turn=40, workers=1, seed=1)
+    assert (serial.winners == result.winners).all()
+
+
+def test_tournament_profile():
+    result = run_tournament([RandomPlayer, FirstPlayer], 2, size=5, max_turn=20, workers=1, seed=2)
+    assert result.stats is None
+    result = run_tournament([RandomPlayer, FirstPlayer], 2, size=5, max_turn=20, workers=1, seed=2, profile=True)
+    assert result.stats['player']['calls'] == result.turns.sum()
+    assert result.stats['playable_moves']['calls'] == result.turns.sum()
+    assert result.stats['is_playable']['time'] > 0
+
+
+def test_tournament_needs_two_players():
+    with pytest.raises(ValueError):
+        run_tournament([RandomPlayer], 2)